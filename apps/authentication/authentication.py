@@ -2,6 +2,7 @@ import jwt
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
+from apps.authentication.cache import revoked_tokens, user_cache
 from apps.authentication.models import BlacklistedToken, AuthToken
 from apps.manager.models import User
 
@@ -15,12 +16,18 @@ class JWTAuthentication(BaseAuthentication):
 
         token = auth_header.split(" ")[1]
 
-        if BlacklistedToken.is_blacklisted(token):
+        # Solo se consulta la BD si el filtro en memoria da un posible acierto
+        if revoked_tokens.might_contain(token) and BlacklistedToken.is_blacklisted(
+            token
+        ):
             raise AuthenticationFailed("Token inválido o revocado.")
 
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            user = User.objects.get(id=payload["user_id"])
+            user = user_cache.get(payload["user_id"])
+            if user is None:
+                user = User.objects.get(id=payload["user_id"])
+                user_cache.set(user)
             return (user, token)
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed("Token expirado.")
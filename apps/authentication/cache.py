@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from apps.authentication.models import BlacklistedToken
+from apps.authentication.utils import hash_token
+from apps.manager.models import User
+
+
+class RevokedTokenFilter:
+    """
+    In-process set of the hashes of the revoked tokens that have not expired.
+
+    A miss means the token was not revoked as of the last refresh, so the
+    database is only consulted on a possible hit. Every ``refresh_interval``
+    seconds the rows created since the previous refresh are read, going back
+    ``overlap`` seconds more: a row is committed after its ``created_at`` (a
+    long transaction, concurrent logouts, clock skew between workers), and the
+    overlap picks it up as long as that delay stays under ``overlap``. The set
+    is also rebuilt from scratch every ``rebuild_interval`` seconds. Tokens
+    revoked in this process are added right away.
+    """
+
+    def __init__(self, refresh_interval=30, rebuild_interval=600, overlap=120):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._digests = {}
+        self._watermark = None
+        self._refreshed_at = None
+        self._rebuilt_at = None
+        self._lock = threading.Lock()
+
+    def might_contain(self, token):
+        self.refresh()
+        expires_at = self._digests.get(hash_token(token))
+        return expires_at is not None and expires_at > timezone.now()
+
+    def add(self, token_hash, expires_at):
+        self._digests[token_hash] = expires_at
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and self._is_fresh(now):
+            return
+
+        with self._lock:
+            if not force and self._is_fresh(now):
+                return
+
+            rebuild = force or (
+                self._rebuilt_at is None or now - self._rebuilt_at >= self.rebuild_interval
+            )
+            current_time = timezone.now()
+            digests = {} if rebuild else self._digests
+
+            rows = BlacklistedToken.objects.filter(expires_at__gt=current_time)
+            if not rebuild:
+                rows = rows.filter(created_at__gte=self._watermark - self.overlap)
+            for token_hash, expires_at in rows.values_list(
+                "token_hash", "expires_at"
+            ).iterator():
+                digests[token_hash] = expires_at
+
+            if not rebuild:
+                for digest, expires_at in list(digests.items()):
+                    if expires_at <= current_time:
+                        del digests[digest]
+
+            self._digests = digests
+            self._watermark = current_time
+            self._refreshed_at = now
+            if rebuild:
+                self._rebuilt_at = now
+
+    def _is_fresh(self, now):
+        return (
+            self._refreshed_at is not None
+            and now - self._refreshed_at < self.refresh_interval
+        )
+
+
+class UserCache:
+    """
+    Small LRU of user rows with a TTL, keyed by id.
+
+    Rows are stored as raw field values and a fresh instance is built on
+    every hit, so requests never share a mutable ``User`` object. The cache
+    is per process: saving a user invalidates it only in the worker that
+    saved it, so other workers may keep authenticating a deactivated or
+    changed user for up to ``ttl`` seconds (``JWT_USER_CACHE_TTL``).
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, values = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        return User.from_db(DEFAULT_DB_ALIAS, self._field_names(), values)
+
+    def set(self, user):
+        values = [getattr(user, name) for name in self._field_names()]
+        with self._lock:
+            self._entries[str(user.pk)] = (time.monotonic(), values)
+            self._entries.move_to_end(str(user.pk))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    @staticmethod
+    def _field_names():
+        return [field.attname for field in User._meta.concrete_fields]
+
+
+revoked_tokens = RevokedTokenFilter(
+    refresh_interval=getattr(settings, "JWT_REVOKED_TOKENS_REFRESH", 30),
+    overlap=getattr(settings, "JWT_REVOKED_TOKENS_OVERLAP", 120),
+)
+user_cache = UserCache(
+    maxsize=getattr(settings, "JWT_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "JWT_USER_CACHE_TTL", 60),
+)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from apps.authentication.purge import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina por lotes los tokens caducados (AuthToken, BlacklistedToken, "
+        "EmailVerification, PasswordResetToken). Pensado para cron, p. ej.: "
+        "*/15 * * * * python manage.py purge_expired_tokens --rate 5000"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Ancho de cada ventana de ids borrada en una transacción",
+        )
+        parser.add_argument(
+            "--rate",
+            type=int,
+            default=None,
+            help="Máximo de filas borradas por segundo (sin límite por defecto)",
+        )
+
+    def handle(self, *args, **options):
+        results = purge_expired_tokens(
+            batch_size=options["batch_size"], max_rows_per_second=options["rate"]
+        )
+
+        total_deleted = 0
+        total_seconds = 0
+        for name, result in results.items():
+            total_deleted += result["deleted"]
+            total_seconds += result["seconds"]
+            self.stdout.write(
+                f"{name}: {result['deleted']} filas eliminadas en {result['seconds']}s"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Total: {total_deleted} filas eliminadas en {round(total_seconds, 3)}s"
+            )
+        )
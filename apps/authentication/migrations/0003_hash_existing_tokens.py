@@ -0,0 +1,50 @@
+import hashlib
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def hash_existing_tokens(apps, schema_editor):
+    AuthToken = apps.get_model("authentication", "AuthToken")
+    BlacklistedToken = apps.get_model("authentication", "BlacklistedToken")
+
+    batch = []
+    for token in AuthToken.objects.only("access_token", "refresh_token").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        token.access_token_hash = hash_token(token.access_token)
+        token.refresh_token_hash = hash_token(token.refresh_token)
+        batch.append(token)
+        if len(batch) >= BATCH_SIZE:
+            AuthToken.objects.bulk_update(
+                batch, ["access_token_hash", "refresh_token_hash"]
+            )
+            batch = []
+    AuthToken.objects.bulk_update(batch, ["access_token_hash", "refresh_token_hash"])
+
+    batch = []
+    for token in BlacklistedToken.objects.only("token").iterator(chunk_size=BATCH_SIZE):
+        token.token_hash = hash_token(token.token)
+        batch.append(token)
+        if len(batch) >= BATCH_SIZE:
+            BlacklistedToken.objects.bulk_update(batch, ["token_hash"])
+            batch = []
+    BlacklistedToken.objects.bulk_update(batch, ["token_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_token_hash_fields"),
+    ]
+
+    operations = [
+        # Los tokens en claro se eliminan en la siguiente migración, así que
+        # no hay vuelta atrás con datos
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+    ]
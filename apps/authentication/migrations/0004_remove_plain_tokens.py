@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0003_hash_existing_tokens"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="authtoken",
+            name="access_token",
+        ),
+        migrations.RemoveField(
+            model_name="authtoken",
+            name="refresh_token",
+        ),
+        migrations.RemoveField(
+            model_name="blacklistedtoken",
+            name="token",
+        ),
+        migrations.AlterField(
+            model_name="authtoken",
+            name="access_token_hash",
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="authtoken",
+            name="refresh_token_hash",
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="blacklistedtoken",
+            name="token_hash",
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
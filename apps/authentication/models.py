@@ -4,12 +4,15 @@ from django.utils import timezone
 import datetime
 import uuid
 
+from apps.authentication.utils import hash_token
+
 
 class AuthToken(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    access_token = models.TextField(unique=True)
-    refresh_token = models.TextField(unique=True)
-    expires_at = models.DateTimeField()
+    # Solo se guarda el SHA-256 (hex) de cada token, nunca el token en claro
+    access_token_hash = models.CharField(max_length=64, unique=True)
+    refresh_token_hash = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def is_valid(self):
@@ -19,26 +22,39 @@ class AuthToken(models.Model):
     def get_active_token(cls, user):
         return cls.objects.filter(user=user, expires_at__gt=timezone.now()).first()
 
+    @classmethod
+    def issue(cls, user, access_token, refresh_token, expires_at):
+        return cls.objects.create(
+            user=user,
+            access_token_hash=hash_token(access_token),
+            refresh_token_hash=hash_token(refresh_token),
+            expires_at=expires_at,
+        )
+
     def revoke(self):
         BlacklistedToken.objects.create(
-            token=self.refresh_token, expires_at=self.expires_at
+            token_hash=self.refresh_token_hash, expires_at=self.expires_at
         )
         self.delete()
 
 
 class BlacklistedToken(models.Model):
-    token = models.TextField(unique=True)
-    expires_at = models.DateTimeField()
+    token_hash = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Marca de agua del refresco incremental de RevokedTokenFilter
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     @classmethod
     def is_blacklisted(cls, token):
-        return cls.objects.filter(token=token, expires_at__gt=timezone.now()).exists()
+        return cls.objects.filter(
+            token_hash=hash_token(token), expires_at__gt=timezone.now()
+        ).exists()
 
 
 class EmailVerification(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     token = models.CharField(max_length=255, default=uuid.uuid4)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_verified = models.BooleanField(default=False)
 
     def is_valid(self):
@@ -49,7 +65,7 @@ class EmailVerification(models.Model):
 class PasswordResetToken(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     token = models.CharField(max_length=255, default=uuid.uuid4)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def is_valid(self):
 
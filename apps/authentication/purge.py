@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.authentication.models import (
+    AuthToken,
+    BlacklistedToken,
+    EmailVerification,
+    PasswordResetToken,
+)
+from apps.common.purge import purge_in_batches
+
+
+def expired_querysets(now=None):
+    """Filas caducadas de cada tabla de tokens, con la misma vigencia que is_valid()."""
+    now = now or timezone.now()
+    return {
+        "AuthToken": AuthToken.objects.filter(expires_at__lte=now),
+        "BlacklistedToken": BlacklistedToken.objects.filter(expires_at__lte=now),
+        # Las verificadas se conservan: guardan el estado is_verified
+        "EmailVerification": EmailVerification.objects.filter(
+            created_at__lte=now - timedelta(days=1), is_verified=False
+        ),
+        "PasswordResetToken": PasswordResetToken.objects.filter(
+            created_at__lte=now - timedelta(hours=24)
+        ),
+    }
+
+
+def purge_expired_tokens(batch_size=1000, max_rows_per_second=None):
+    """
+    Job programable (cron, scheduler) que purga los tokens caducados.
+    Devuelve {modelo: {"deleted": n, "seconds": s}}.
+    """
+    return {
+        name: purge_in_batches(
+            queryset, batch_size=batch_size, max_rows_per_second=max_rows_per_second
+        )
+        for name, queryset in expired_querysets().items()
+    }
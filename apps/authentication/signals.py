@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.authentication.cache import revoked_tokens, user_cache
+from apps.authentication.models import BlacklistedToken
+from apps.manager.models import User
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def remember_revoked_token(sender, instance, created, **kwargs):
+    if created:
+        revoked_tokens.add(instance.token_hash, instance.expires_at)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
@@ -1,3 +1,116 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.cache import RevokedTokenFilter, UserCache, user_cache
+from apps.authentication.models import AuthToken, BlacklistedToken
+from apps.authentication.utils import (
+    generate_access_token,
+    generate_refresh_token,
+    hash_token,
+)
+from apps.manager.models import User
+
+
+class TokenDigestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.access = generate_access_token(self.user)
+        self.refresh = generate_refresh_token()
+        AuthToken.issue(
+            self.user, self.access, self.refresh, timezone.now() + timedelta(days=1)
+        )
+
+    def test_only_digests_are_stored(self):
+        token = AuthToken.objects.get(user=self.user)
+        self.assertEqual(token.access_token_hash, hash_token(self.access))
+        self.assertEqual(token.refresh_token_hash, hash_token(self.refresh))
+        self.assertEqual(len(token.refresh_token_hash), 64)
+
+    def test_refresh_rotates_and_revokes_the_old_token(self):
+        client = APIClient()
+        response = client.post(
+            "/authentication/refresh/", {"refresh_token": self.refresh}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(BlacklistedToken.is_blacklisted(self.refresh))
+        self.assertTrue(
+            AuthToken.objects.filter(
+                refresh_token_hash=hash_token(response.data["refresh_token"])
+            ).exists()
+        )
+
+        response = client.post(
+            "/authentication/refresh/", {"refresh_token": self.refresh}, format="json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class RevokedTokenFilterTests(TestCase):
+    def revoke(self, token, created_at, pk=None):
+        record = BlacklistedToken.objects.create(
+            pk=pk,
+            token_hash=hash_token(token),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        # auto_now_add: la fecha del INSERT se fija después
+        BlacklistedToken.objects.filter(pk=record.pk).update(created_at=created_at)
+
+    def test_row_committed_late_is_picked_up(self):
+        revoked = RevokedTokenFilter(refresh_interval=0, overlap=120)
+        self.revoke("first", timezone.now(), pk=10)
+        revoked.refresh()
+        self.assertTrue(revoked.might_contain("first"))
+
+        # Id y fecha anteriores al último refresco, confirmada después
+        self.revoke("late", timezone.now() - timedelta(seconds=30), pk=5)
+        self.assertTrue(revoked.might_contain("late"))
+
+    def test_unrevoked_token_is_a_miss(self):
+        revoked = RevokedTokenFilter(refresh_interval=0)
+        self.revoke("revoked", timezone.now())
+        self.assertFalse(revoked.might_contain("other"))
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+
+    def test_hit_builds_a_fresh_instance(self):
+        users = UserCache()
+        users.set(self.user)
+        cached = users.get(self.user.pk)
+
+        self.assertEqual(cached.email, "user@example.com")
+        self.assertIsNot(cached, self.user)
+        self.assertIsNot(users.get(self.user.pk), cached)
+
+    def test_expired_and_evicted_entries_are_misses(self):
+        expired = UserCache(ttl=0)
+        expired.set(self.user)
+        self.assertIsNone(expired.get(self.user.pk))
+
+        other = User.objects.create_user(email="other@example.com", password="x")
+        users = UserCache(maxsize=1)
+        users.set(self.user)
+        users.set(other)
+        self.assertIsNone(users.get(self.user.pk))
+        self.assertEqual(users.get(other.pk).pk, other.pk)
+
+    def test_authentication_reads_cached_user_until_saved(self):
+        user_cache.invalidate(self.user.pk)
+        client = APIClient()
+        token = generate_access_token(self.user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        client.get("/shoppin_car/cart/")
+        with self.assertNumQueries(1):
+            # Solo las líneas del carrito: el usuario sale de la caché
+            response = client.get("/shoppin_car/cart/")
+        self.assertEqual(response.status_code, 200)
 
-# Create your tests here.
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user_cache.get(self.user.pk))
@@ -1,3 +1,4 @@
+import hashlib
 import jwt
 import uuid
 from django.conf import settings
@@ -21,6 +22,11 @@ def generate_refresh_token():
     return str(uuid.uuid4())
 
 
+def hash_token(token):
+    """SHA-256 en hexadecimal, de ancho fijo, que es lo que se guarda en la BD."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 # apps/authentication/utils.py
 
 
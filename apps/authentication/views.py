@@ -15,6 +15,7 @@ from .serializers import (
 from .utils import (
     generate_access_token,
     generate_refresh_token,
+    hash_token,
     send_verification_email,
     send_password_reset_email,
 )
@@ -70,12 +71,7 @@ class LoginView(APIView):
             refresh_token = generate_refresh_token()
             expires_at = timezone.now() + timedelta(days=7)
 
-            AuthToken.objects.create(
-                user=user,
-                access_token=access_token,
-                refresh_token=refresh_token,
-                expires_at=expires_at,
-            )
+            AuthToken.issue(user, access_token, refresh_token, expires_at)
 
             return Response(
                 {
@@ -126,7 +122,11 @@ class RefreshTokenView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED,
                 )
 
-            token_obj = AuthToken.objects.filter(refresh_token=refresh_token).first()
+            token_obj = (
+                AuthToken.objects.select_related("user")
+                .filter(refresh_token_hash=hash_token(refresh_token))
+                .first()
+            )
             if not token_obj or not token_obj.is_valid():
                 return Response(
                     {"error": "Refresh token inválido o expirado"},
@@ -138,11 +138,8 @@ class RefreshTokenView(APIView):
             new_expires_at = timezone.now() + timedelta(days=7)
 
             token_obj.revoke()
-            AuthToken.objects.create(
-                user=token_obj.user,
-                access_token=new_access_token,
-                refresh_token=new_refresh_token,
-                expires_at=new_expires_at,
+            AuthToken.issue(
+                token_obj.user, new_access_token, new_refresh_token, new_expires_at
             )
 
             return Response(
@@ -176,7 +173,9 @@ class LogoutView(APIView):
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
             user = User.objects.get(id=payload["user_id"])
 
-            token_obj = AuthToken.objects.filter(access_token=token, user=user).first()
+            token_obj = AuthToken.objects.filter(
+                access_token_hash=hash_token(token), user=user
+            ).first()
             if token_obj:
                 token_obj.revoke()
 
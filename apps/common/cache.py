@@ -0,0 +1,128 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from rest_framework.response import Response
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized responses grouped in a namespace.
+
+    Every key embeds the namespace version, so bumping the version
+    invalidates all the entries at once without scanning keys. The backend
+    is any cache alias from ``settings.CACHES``.
+    """
+
+    def __init__(self, namespace, alias="default"):
+        self.namespace = namespace
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, suffix):
+        return f"{self.namespace}:{suffix}"
+
+    def get_version(self):
+        version = self.cache.get(self._key("version"))
+        if version is None:
+            # Un valor basado en el tiempo evita reutilizar versiones antiguas
+            # si la clave de versión fue desalojada
+            self.cache.add(self._key("version"), time.time_ns(), timeout=None)
+            version = self.cache.get(self._key("version"))
+        return version
+
+    def bump_version(self):
+        try:
+            return self.cache.incr(self._key("version"))
+        except ValueError:
+            self.cache.set(self._key("version"), time.time_ns(), timeout=None)
+
+    def make_key(self, request, *parts):
+        params = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+            if value != ""
+        )
+        return self.key_for(request.get_host(), request.path, params, parts)
+
+    def key_for(self, *parts):
+        """Versioned key for any values with a stable ``repr``."""
+        digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+        return self._key(f"{self.get_version()}:{digest}")
+
+    def get(self, key):
+        data = self.cache.get(key)
+        self._count("hits" if data is not None else "misses")
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data)
+
+    def _count(self, counter):
+        key = self._key(counter)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+    def stats(self):
+        values = self.cache.get_many(
+            [self._key("hits"), self._key("misses"), self._key("version")]
+        )
+        hits = values.get(self._key("hits"), 0)
+        misses = values.get(self._key("misses"), 0)
+        total = hits + misses
+        return {
+            "namespace": self.namespace,
+            "backend": self.alias,
+            "version": values.get(self._key("version")),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list`` and ``retrieve`` from ``response_cache``.
+
+    The key covers the path, the normalized query params, the URL kwargs and
+    the serializer class. Only successful responses are stored.
+    """
+
+    response_cache = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.response_cache is None:
+            return handler(request, *args, **kwargs)
+
+        serializer_class = self.get_serializer_class()
+        key = self.response_cache.make_key(
+            request,
+            self.action,
+            sorted(kwargs.items()),
+            f"{serializer_class.__module__}.{serializer_class.__qualname__}",
+        )
+
+        data = self.response_cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
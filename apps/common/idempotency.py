@@ -0,0 +1,150 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.response import Response
+
+from drf_yasg import openapi as oa
+
+from apps.common.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+IDEMPOTENCY_KEY_PARAMETER = oa.Parameter(
+    name=IDEMPOTENCY_HEADER,
+    in_=oa.IN_HEADER,
+    description="Clave única por operación; los reintentos devuelven la misma respuesta",
+    type=oa.TYPE_STRING,
+    required=False,
+)
+
+
+def _request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _claim(user, endpoint, key, request_hash):
+    """
+    Inserta la clave. Si otra petición con la misma clave está en curso, el
+    INSERT espera en el índice único a que esa transacción termine.
+    """
+    ttl = getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user=user,
+                endpoint=endpoint,
+                key=key,
+                request_hash=request_hash,
+                expires_at=timezone.now() + timedelta(seconds=ttl),
+            )
+    except IntegrityError:
+        return None
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def stored_response(request):
+    """
+    Respuesta ya guardada para la Idempotency-Key de la petición, o None.
+
+    Sirve a las vistas que hacen trabajo previo fuera de la transacción de
+    ``idempotent`` (p. ej. esperar turno) para responder antes a un reintento.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return None
+    record = IdempotencyKey.objects.filter(
+        user=request.user,
+        endpoint=request.path,
+        key=key,
+        status_code__isnull=False,
+        expires_at__gt=timezone.now(),
+    ).first()
+    if record is None or record.request_hash != _request_hash(request):
+        return None
+    return _replay(record)
+
+
+def idempotent(view_method):
+    """
+    Honor the ``Idempotency-Key`` header on an APIView method.
+
+    The first request runs in a transaction together with the key row and
+    stores its status and body; a 5xx response rolls both back. Retries are
+    replayed from that row without running the view again; concurrent
+    duplicates wait for the first one to commit. Requests without the header
+    are not affected.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response(
+                {"error": _("Idempotency-Key demasiado larga")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        request_hash = _request_hash(request)
+
+        for attempt in range(2):
+            with transaction.atomic():
+                record = _claim(request.user, request.path, key, request_hash)
+                if record is not None:
+                    response = view_method(self, request, *args, **kwargs)
+                    if response.status_code >= 500:
+                        # Los errores del servidor no se guardan: se deshacen
+                        # la clave y lo que la vista escribió, y se puede
+                        # reintentar
+                        transaction.set_rollback(True)
+                    else:
+                        record.status_code = response.status_code
+                        record.response_body = response.data
+                        record.save(update_fields=["status_code", "response_body"])
+                    return response
+
+            record = IdempotencyKey.objects.filter(
+                user=request.user, endpoint=request.path, key=key
+            ).first()
+            if record is None:
+                continue
+            if record.expires_at <= timezone.now():
+                record.delete()
+                continue
+            break
+        else:
+            return Response(
+                {"error": _("Petición en curso con la misma Idempotency-Key")},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if record.request_hash != request_hash:
+            return Response(
+                {"error": _("La Idempotency-Key ya se usó con otro cuerpo")},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        if record.status_code is None:
+            return Response(
+                {"error": _("Petición en curso con la misma Idempotency-Key")},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return _replay(record)
+
+    return wrapper
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.common.models import IdempotencyKey
+from apps.common.purge import purge_in_batches
+
+
+class Command(BaseCommand):
+    help = "Elimina por lotes las Idempotency-Key caducadas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--rate", type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = purge_in_batches(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now()),
+            batch_size=options["batch_size"],
+            max_rows_per_second=options["rate"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['deleted']} filas eliminadas en {result['seconds']}s"
+            )
+        )
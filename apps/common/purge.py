@@ -0,0 +1,35 @@
+import time
+
+from django.db import transaction
+from django.db.models import Max, Min
+
+
+def purge_in_batches(queryset, batch_size=1000, max_rows_per_second=None):
+    """
+    Delete the rows of ``queryset`` in primary-key windows of ``batch_size``.
+
+    Each window is its own short transaction, so locks are held briefly and
+    the deletes never scan the whole table at once. ``max_rows_per_second``
+    throttles the purge by sleeping between windows.
+    Returns ``{"deleted": int, "seconds": float}``.
+    """
+    started = time.monotonic()
+    deleted = 0
+
+    bounds = queryset.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is not None:
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            with transaction.atomic():
+                count, _ = queryset.filter(
+                    pk__gte=start, pk__lt=start + batch_size
+                ).delete()
+            deleted += count
+
+            if max_rows_per_second and count:
+                # Dormir lo necesario para no superar la tasa indicada
+                expected = deleted / max_rows_per_second
+                elapsed = time.monotonic() - started
+                if expected > elapsed:
+                    time.sleep(expected - elapsed)
+
+    return {"deleted": deleted, "seconds": round(time.monotonic() - started, 3)}
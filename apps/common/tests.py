@@ -1,3 +1,57 @@
+from django.contrib.auth.models import Group
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
 
-# Create your tests here.
+from apps.common.idempotency import idempotent
+from apps.common.models import IdempotencyKey
+from apps.manager.models import User
+
+
+class CreateGroupView(APIView):
+    status_code = status.HTTP_201_CREATED
+
+    @idempotent
+    def post(self, request):
+        group = Group.objects.create(name=f"group-{Group.objects.count()}")
+        return Response({"id": group.pk}, status=self.status_code)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.factory = APIRequestFactory()
+
+    def post(self, view, body, key="key-1"):
+        request = self.factory.post(
+            "/groups/", body, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+        force_authenticate(request, self.user)
+        return view(request)
+
+    def test_retry_is_replayed_without_running_the_view(self):
+        view = CreateGroupView.as_view()
+        first = self.post(view, {"name": "a"})
+        retry = self.post(view, {"name": "a"})
+
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Group.objects.count(), 1)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        view = CreateGroupView.as_view()
+        self.post(view, {"name": "a"})
+        self.assertEqual(self.post(view, {"name": "b"}).status_code, 422)
+
+    def test_server_error_rolls_back_the_view_writes(self):
+        failing = CreateGroupView.as_view(status_code=500)
+        self.assertEqual(self.post(failing, {"name": "a"}).status_code, 500)
+        self.assertFalse(Group.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        retry = self.post(CreateGroupView.as_view(), {"name": "a"})
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(Group.objects.count(), 1)
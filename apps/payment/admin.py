@@ -6,13 +6,31 @@ from apps.payment.models import Order
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "is_paid", "created_by", "created_date")
+    list_display = (
+        "id",
+        "user",
+        "is_paid",
+        "total_amount",
+        "item_count",
+        "created_by",
+        "created_date",
+    )
     list_filter = ("is_paid", "created_date")
     search_fields = ("user__email",)
-    readonly_fields = ("created_by", "created_date", "updated_by", "updated_date")
+    readonly_fields = (
+        "total_amount",
+        "item_count",
+        "paid_amount",
+        "change",
+        "created_by",
+        "created_date",
+        "updated_by",
+        "updated_date",
+    )
 
     fieldsets = (
         (None, {"fields": ("user", "is_paid")}),
+        ("Totales", {"fields": ("total_amount", "item_count", "paid_amount", "change")}),
         (
             "Auditoría",
             {
@@ -0,0 +1,225 @@
+"""
+Flash-sale admission control.
+
+Products with ``flash_sale`` enabled are guarded by cache counters before any
+database work: a counter of units still on sale rejects buyers once it hits
+zero, and a ticket/serving pair admits buyers in arrival order, at most
+``FLASH_SALE_BATCH_SIZE`` of them per product at a time. Each buyer takes a
+ticket and enters once ``ticket <= serving + FLASH_SALE_BATCH_SIZE``; each one
+leaving checkout advances ``serving``. Up to ``FLASH_SALE_MAX_QUEUE`` tickets
+wait beyond that window for ``FLASH_SALE_MAX_WAIT`` seconds; the rest get a
+429 with ``Retry-After``. A ticket given up before entering is marked and
+skipped when ``serving`` reaches it, so it neither stalls nor widens the
+window. A counter of buyers in checkout still caps the batch. The inventory
+lock remains the source of truth; these counters only keep the crowd away
+from it.
+
+The counters must live in a cache shared by all workers (``FLASH_SALE_CACHE``).
+Checkout slots of a worker that dies mid-request are recovered when the keys
+expire after ``FLASH_SALE_QUEUE_TTL`` seconds without traffic.
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.products import inventory
+
+POLL_INTERVAL = 0.05
+
+
+class SoldOut(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Producto agotado")
+    default_code = "sold_out"
+
+
+class Overloaded(APIException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_detail = _("Demasiadas compras simultáneas, vuelve a intentarlo")
+    default_code = "overloaded"
+
+    def __init__(self, wait):
+        super().__init__()
+        # El manejador de excepciones de DRF lo envía como Retry-After
+        self.wait = wait
+
+
+def _cache():
+    return caches[settings.FLASH_SALE_CACHE]
+
+
+def _keys(product_id):
+    prefix = f"flash:{product_id}"
+    return (
+        f"{prefix}:remaining",
+        f"{prefix}:active",
+        f"{prefix}:ticket",
+        f"{prefix}:serving",
+    )
+
+
+def _gone_key(product_id, ticket):
+    return f"flash:{product_id}:gone:{ticket}"
+
+
+def _incr(cache, key, ttl):
+    cache.add(key, 0, ttl)
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        # La clave expiró entre add e incr
+        cache.add(key, 0, ttl)
+        value = cache.incr(key)
+    cache.touch(key, ttl)
+    return value
+
+
+def _decr(cache, key):
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+
+
+def _take_ticket(cache, product_id):
+    ttl = settings.FLASH_SALE_QUEUE_TTL
+    ticket_key, serving_key = _keys(product_id)[2:]
+    ticket = _incr(cache, ticket_key, ttl)
+    if ticket == 1:
+        # Secuencia nueva: el serving de una anterior ya no vale
+        cache.set(serving_key, 0, ttl)
+    else:
+        # Si serving se perdió, los turnos anteriores se dan por servidos; el
+        # contador de plazas sigue limitando el lote
+        cache.add(serving_key, ticket - 1, ttl)
+        cache.touch(serving_key, ttl)
+    return ticket
+
+
+def _ahead(cache, product_id, ticket):
+    """Turnos por delante fuera de la ventana; <= 0 si ya puede entrar."""
+    serving = cache.get(_keys(product_id)[3], 0)
+    return ticket - serving - settings.FLASH_SALE_BATCH_SIZE
+
+
+def _advance(cache, product_id):
+    """Avanza serving un turno, saltando los que se fueron sin entrar."""
+    ttl = settings.FLASH_SALE_QUEUE_TTL
+    ticket_key, serving_key = _keys(product_id)[2:]
+    while True:
+        serving = _incr(cache, serving_key, ttl)
+        cache.touch(ticket_key, ttl)
+        # Cada valor de serving lo recibe un solo proceso: el turno que entra
+        # en la ventana lo revisa exactamente uno
+        covered = serving + settings.FLASH_SALE_BATCH_SIZE
+        if not cache.delete(_gone_key(product_id, covered)):
+            return
+
+
+class Admission:
+    """Unidades y plazas concedidas a una compra; se devuelven en ``release``."""
+
+    def __init__(self):
+        self.reserved = {}
+        self.admitted = []
+        self.sold = {}
+
+    def reserve(self, product_id, quantity):
+        cache = _cache()
+        remaining_key = _keys(product_id)[0]
+        balance = inventory.cached_balances([product_id])[product_id]
+        cache.add(remaining_key, balance, settings.FLASH_SALE_COUNTER_TTL)
+        try:
+            left = cache.decr(remaining_key, quantity)
+        except ValueError:
+            # El contador expiró entre add y decr; se vuelve a sembrar
+            cache.add(remaining_key, balance, settings.FLASH_SALE_COUNTER_TTL)
+            left = cache.decr(remaining_key, quantity)
+
+        if left + quantity <= 0:
+            cache.incr(remaining_key, quantity)
+            raise SoldOut()
+        if left < 0:
+            # Solo queda una parte: se reserva lo que hay
+            cache.incr(remaining_key, -left)
+            quantity += left
+        self.reserved[product_id] = quantity
+
+    def try_enter(self, product_id):
+        """Ocupa una plaza del lote en checkout si queda alguna libre."""
+        cache = _cache()
+        active_key = _keys(product_id)[1]
+        if _incr(cache, active_key, settings.FLASH_SALE_QUEUE_TTL) <= (
+            settings.FLASH_SALE_BATCH_SIZE
+        ):
+            self.admitted.append(product_id)
+            return True
+        _decr(cache, active_key)
+        return False
+
+    def enter(self, product_id):
+        """
+        Toma turno y espera a que la ventana del lote lo alcance. Los que
+        llegan con la cola llena se rechazan sin esperar.
+        """
+        cache = _cache()
+        ticket = _take_ticket(cache, product_id)
+        deadline = time.monotonic() + settings.FLASH_SALE_MAX_WAIT
+        while True:
+            ahead = _ahead(cache, product_id, ticket)
+            if ahead <= 0 and self.try_enter(product_id):
+                return
+            if ahead > settings.FLASH_SALE_MAX_QUEUE or (
+                time.monotonic() >= deadline
+            ):
+                self.leave(product_id, ticket)
+                raise Overloaded(settings.FLASH_SALE_RETRY_AFTER)
+            time.sleep(POLL_INTERVAL)
+
+    def leave(self, product_id, ticket):
+        """Abandona un turno sin haber entrado."""
+        cache = _cache()
+        gone_key = _gone_key(product_id, ticket)
+        cache.set(gone_key, 1, settings.FLASH_SALE_QUEUE_TTL)
+        # Si la ventana ya cubre el turno, quien la avanzó pudo no ver la marca:
+        # lo salta quien consiga borrarla
+        if _ahead(cache, product_id, ticket) <= 0 and cache.delete(gone_key):
+            _advance(cache, product_id)
+
+    def release(self):
+        cache = _cache()
+        for product_id in self.admitted:
+            _decr(cache, _keys(product_id)[1])
+            _advance(cache, product_id)
+        for product_id, quantity in self.reserved.items():
+            unsold = quantity - self.sold.get(product_id, 0)
+            if unsold > 0:
+                try:
+                    cache.incr(_keys(product_id)[0], unsold)
+                except ValueError:
+                    pass
+
+
+@contextmanager
+def admit(quantities):
+    """
+    Admite una compra de ``{product_id: quantity}`` de productos en oferta
+    relámpago. Lanza ``SoldOut`` u ``Overloaded`` antes de tocar la base de
+    datos. Quien compra debe anotar lo vendido en ``admission.sold``.
+    """
+    admission = Admission()
+    try:
+        # Orden fijo de productos, igual que el bloqueo de inventario
+        for product_id in sorted(quantities):
+            admission.reserve(product_id, quantities[product_id])
+        for product_id in sorted(quantities):
+            admission.enter(product_id)
+        yield admission
+    finally:
+        admission.release()
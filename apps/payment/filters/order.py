@@ -0,0 +1,14 @@
+import django_filters
+from apps.payment.models import Order
+
+
+class OrderFilter(django_filters.FilterSet):
+    # ?created_date_after=...&created_date_before=... (ISO 8601)
+    created_date = django_filters.IsoDateTimeFromToRangeFilter()
+    is_paid = django_filters.BooleanFilter()
+    is_active = django_filters.BooleanFilter()
+    user = django_filters.NumberFilter(field_name="user_id")
+
+    class Meta:
+        model = Order
+        fields = ["created_date", "is_paid", "is_active", "user"]
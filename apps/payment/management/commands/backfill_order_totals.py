@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Sum
+
+from django.core.management.base import BaseCommand
+
+from apps.payment.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = "Calcula total_amount e item_count de las órdenes existentes por lotes de ids"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        bounds = Order.objects.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            self.stdout.write("No hay órdenes")
+            return
+
+        updated = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            window = {"order_id__gte": start, "order_id__lt": start + batch_size}
+            totals = {
+                row["order_id"]: row
+                for row in OrderItem.objects.filter(**window)
+                .values("order_id")
+                .annotate(
+                    total=Sum(
+                        F("quantity") * F("price"),
+                        output_field=DecimalField(max_digits=12, decimal_places=2),
+                    ),
+                    lines=Count("id"),
+                )
+            }
+
+            with transaction.atomic():
+                orders = list(
+                    Order.objects.select_for_update()
+                    .filter(id__gte=start, id__lt=start + batch_size)
+                    .only("id", "total_amount", "item_count")
+                )
+                for order in orders:
+                    row = totals.get(order.id)
+                    order.total_amount = row["total"] if row else 0
+                    order.item_count = row["lines"] if row else 0
+                Order.objects.bulk_update(orders, ["total_amount", "item_count"])
+            updated += len(orders)
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} órdenes actualizadas"))
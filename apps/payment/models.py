@@ -3,6 +3,7 @@
 from django.db import models
 from apps.common.models import AuditableMixins
 from apps.manager.models import User
+from apps.products.models.category import Category
 from apps.products.models.product import Product
 
 
@@ -10,6 +11,24 @@ class Order(AuditableMixins):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     is_paid = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
+    # Columnas desnormalizadas, escritas en la misma transacción que las líneas
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    item_count = models.PositiveIntegerField(default=0, help_text="Número de líneas")
+    # Nulos en órdenes antiguas, donde el pago no se registró
+    paid_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    change = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Orden de la paginación por cursor del listado de órdenes
+            models.Index(fields=["-created_date", "-id"], name="order_created_idx"),
+            # Historial de cada usuario ("Mis órdenes")
+            models.Index(
+                fields=["user", "-created_date", "-id"], name="order_user_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Orden {self.id} - {self.user.email}"
@@ -23,3 +42,54 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
+
+
+ROLLUP_GRAIN_CHOICES = [
+    ("hour", "Hora"),
+    ("day", "Día"),
+]
+
+
+class SalesRollup(models.Model):
+    """Ventas agregadas por periodo; mantenidas por apps.payment.rollups."""
+
+    grain = models.CharField(max_length=4, choices=ROLLUP_GRAIN_CHOICES)
+    # Inicio de la hora o del día en la zona horaria del proyecto
+    bucket = models.DateTimeField()
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    line_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class ProductSalesRollup(SalesRollup):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            # Clave del upsert incremental y del rango (grain, bucket)
+            models.UniqueConstraint(
+                fields=["grain", "bucket", "product"],
+                name="unique_product_sales_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.grain} {self.bucket:%Y-%m-%d %H:%M}"
+
+
+class CategorySalesRollup(SalesRollup):
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["grain", "bucket", "category"],
+                name="unique_category_sales_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id} {self.grain} {self.bucket:%Y-%m-%d %H:%M}"
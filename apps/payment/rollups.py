@@ -0,0 +1,100 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.payment.models import CategorySalesRollup, ProductSalesRollup
+
+GRAINS = ("hour", "day")
+
+
+def truncate(moment, grain):
+    """Inicio de la hora o del día de ``moment`` en la zona horaria actual."""
+    moment = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    if grain == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def collect(rows):
+    """
+    Agrupa ventas ``(moment, product_id, category_id, quantity, revenue,
+    lines)`` en deltas por (grain, bucket, producto) y (grain, bucket,
+    categoría).
+    """
+    products = defaultdict(lambda: [0, Decimal("0"), 0])
+    categories = defaultdict(lambda: [0, Decimal("0"), 0])
+    for moment, product_id, category_id, quantity, revenue, lines in rows:
+        for grain in GRAINS:
+            bucket = truncate(moment, grain)
+            for totals in (
+                products[(grain, bucket, product_id)],
+                categories[(grain, bucket, category_id)],
+            ):
+                totals[0] += quantity
+                totals[1] += revenue
+                totals[2] += lines
+    return products, categories
+
+
+def _upsert(model, key_column, deltas):
+    if not deltas:
+        return
+    ops = connection.ops
+    table = ops.quote_name(model._meta.db_table)
+    values = []
+    params = []
+    # Orden fijo de claves para no interbloquear con otra escritura
+    for (grain, bucket, key), (quantity, revenue, lines) in sorted(deltas.items()):
+        values.append("(%s, %s, %s, %s, %s, %s)")
+        params += [
+            grain,
+            ops.adapt_datetimefield_value(bucket),
+            key,
+            quantity,
+            ops.adapt_decimalfield_value(revenue, 14, 2),
+            lines,
+        ]
+    sql = f"""
+        INSERT INTO {table} (grain, bucket, {key_column}, quantity, revenue, line_count)
+        VALUES {", ".join(values)}
+        ON CONFLICT (grain, bucket, {key_column}) DO UPDATE SET
+            quantity = {table}.quantity + EXCLUDED.quantity,
+            revenue = {table}.revenue + EXCLUDED.revenue,
+            line_count = {table}.line_count + EXCLUDED.line_count
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def apply(rows):
+    """Suma las ventas ``rows`` a las tablas de rollup (ver ``collect``)."""
+    products, categories = collect(rows)
+    with transaction.atomic():
+        _upsert(ProductSalesRollup, "product_id", products)
+        _upsert(CategorySalesRollup, "category_id", categories)
+
+
+def record_order(order, order_items):
+    """
+    Registra las líneas de una orden recién creada en los rollups.
+
+    Se aplica tras el commit de la compra, en su propia transacción corta, para
+    no alargar los bloqueos del checkout con filas de rollup muy concurridas.
+    Si el proceso cae entre ambos commits, ``rebuild_sales_rollups`` lo
+    corrige.
+    """
+    rows = [
+        (
+            order.created_date,
+            item.product.pk,
+            item.product.category_id,
+            item.quantity,
+            item.quantity * item.price,
+            1,
+        )
+        for item in order_items
+    ]
+    if rows:
+        transaction.on_commit(lambda: apply(rows))
@@ -1,5 +1,11 @@
-from apps.payment.serializers.order import OrderSerializer
+from apps.payment.serializers.order import (
+    OrderHistorySerializer,
+    OrderItemSerializer,
+    OrderSerializer,
+    OrderWithItemsSerializer,
+)
 from apps.payment.serializers.purchase import (
     PurchaseItemSerializer,
     PurchaseRequestSerializer,
 )
+from apps.payment.serializers.report import SalesReportQuerySerializer
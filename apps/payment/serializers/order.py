@@ -2,11 +2,45 @@
 
 from rest_framework import serializers
 from apps.common.serializer import AuditableSerializerMixin
-from apps.payment.models import Order
+from apps.payment.models import Order, OrderItem
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source="product.name", read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ["id", "product", "product_name", "quantity", "price"]
+        read_only_fields = fields
 
 
 class OrderSerializer(AuditableSerializerMixin):
     class Meta:
         model = Order
         fields = "__all__"
-        read_only_fields = ["created_date", "created_by", "updated_date", "updated_by"]
+        read_only_fields = [
+            "created_date",
+            "created_by",
+            "updated_date",
+            "updated_by",
+            "total_amount",
+            "item_count",
+            "paid_amount",
+            "change",
+        ]
+
+
+class OrderWithItemsSerializer(OrderSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+
+class OrderHistorySerializer(serializers.ModelSerializer):
+    total = serializers.DecimalField(
+        source="total_amount", max_digits=12, decimal_places=2, read_only=True
+    )
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ["id", "created_date", "is_paid", "total", "item_count", "items"]
+        read_only_fields = fields
@@ -1,6 +1,8 @@
 # apps/payment/serializers.py
 
+from django.db.models.functions import Lower
 from rest_framework import serializers
+from apps.products import inventory
 from apps.products.models.product import Product
 
 
@@ -8,85 +10,77 @@ class PurchaseItemSerializer(serializers.Serializer):
     product_name = serializers.CharField(max_length=255)
     quantity = serializers.IntegerField(min_value=1)
 
-    def validate(self, data):
-        product_name = data["product_name"]
-        quantity = data["quantity"]
-
-        try:
-            product = Product.objects.get(name__iexact=product_name)
-        except Product.DoesNotExist:
-            raise serializers.ValidationError(
-                {
-                    "product_name": f"No se encontró ningún producto con el nombre '{product_name}'"
-                }
-            )
-
-        if not product.is_active:
-            raise serializers.ValidationError(
-                {"product_name": f"El producto '{product.name}' no está disponible"}
-            )
-
-        if product.stock < quantity:
-            raise serializers.ValidationError(
-                {
-                    "quantity": f"No hay suficiente stock de '{product.name}'. Disponible: {product.stock}, solicitado: {quantity}"
-                }
-            )
-
-        # Añadimos el producto al validated_data para usarlo luego
-        data["product"] = product
-        return data
-
 
 class PurchaseRequestSerializer(serializers.Serializer):
     items = PurchaseItemSerializer(many=True)
     payment_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
 
+    def resolve_products(self, items):
+        """
+        Resuelve todos los nombres en una sola consulta, apoyada en el índice
+        funcional sobre Lower(name). Devuelve {nombre en minúsculas: producto}.
+        """
+        names = {item["product_name"].lower() for item in items}
+        products = {}
+        queryset = (
+            Product.objects.annotate(name_lower=Lower("name"))
+            .filter(name_lower__in=names)
+            .order_by("pk")
+        )
+        for product in queryset:
+            products.setdefault(product.name_lower, product)
+        return products
+
     def validate(self, data):
         validated_items = []
+        errors = []
         partial_purchase = False
         partial_message = ""
 
         items = data.get("items", [])
         payment_amount = data["payment_amount"]
+        products = self.resolve_products(items)
+        # Validación previa con el saldo cacheado; la venta lo recomprueba
+        balances = inventory.cached_balances(
+            product.pk for product in products.values()
+        )
 
         for item in items:
-            try:
-                # Validación normal
-                item_serializer = PurchaseItemSerializer(data=item)
-                item_serializer.is_valid(raise_exception=True)
-            except serializers.ValidationError as e:
-                detail = e.detail
-                if "product_name" in detail:
-                    # Si falla por nombre de producto, propagamos el error
-                    raise serializers.ValidationError(detail)
-                elif "quantity" in detail:
-                    # Si falla por stock, intentamos validar cantidad menor
-                    product = item_serializer.validated_data.get("product")
-                    if product:
-                        max_possible = min(product.stock, item["quantity"])
-                        partial_message += (
-                            f"Solo puedes comprar {max_possible} de '{product.name}'. "
-                        )
-                        validated_items.append(
-                            {
-                                "product": product,
-                                "quantity": max_possible,
-                                "price": product.price,
-                            }
-                        )
-                        partial_purchase = True
-                    else:
-                        raise serializers.ValidationError(detail)
-            else:
-                validated_item = item_serializer.validated_data
-                validated_items.append(
+            product_name = item["product_name"]
+            quantity = item["quantity"]
+            product = products.get(product_name.lower())
+
+            if product is None:
+                errors.append(
                     {
-                        "product": validated_item["product"],
-                        "quantity": validated_item["quantity"],
-                        "price": validated_item["product"].price,
+                        "product_name": f"No se encontró ningún producto con el nombre '{product_name}'"
                     }
                 )
+                continue
+
+            if not product.is_active:
+                errors.append(
+                    {"product_name": f"El producto '{product.name}' no está disponible"}
+                )
+                continue
+
+            errors.append({})
+
+            if balances[product.pk] < quantity:
+                # Si falla por stock, se compra la cantidad disponible
+                max_possible = max(min(balances[product.pk], quantity), 0)
+                partial_message += (
+                    f"Solo puedes comprar {max_possible} de '{product.name}'. "
+                )
+                quantity = max_possible
+                partial_purchase = True
+
+            validated_items.append(
+                {"product": product, "quantity": quantity, "price": product.price}
+            )
+
+        if any(errors):
+            raise serializers.ValidationError({"items": errors})
 
         total_price = sum(item["quantity"] * item["price"] for item in validated_items)
 
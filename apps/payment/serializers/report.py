@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+# Rango máximo por consulta, para que la respuesta siga siendo pequeña
+MAX_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=366)}
+
+
+class SalesReportQuerySerializer(serializers.Serializer):
+    grain = serializers.ChoiceField(choices=["hour", "day"], default="day")
+    by = serializers.ChoiceField(choices=["product", "category"], default="product")
+    start = serializers.DateTimeField(input_formats=["iso-8601", "%Y-%m-%d"])
+    end = serializers.DateTimeField(input_formats=["iso-8601", "%Y-%m-%d"])
+    id = serializers.IntegerField(min_value=1, required=False)
+    top = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, data):
+        if data["end"] <= data["start"]:
+            raise serializers.ValidationError(
+                {"end": _("Debe ser posterior a start")}
+            )
+        if data["end"] - data["start"] > MAX_RANGE[data["grain"]]:
+            raise serializers.ValidationError(
+                {"end": _("Rango demasiado amplio para esta granularidad")}
+            )
+        return data
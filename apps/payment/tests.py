@@ -1,3 +1,383 @@
-from django.test import TestCase
+import io
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.manager.models import User
+from apps.payment import admission, rollups
+from apps.payment.models import (
+    CategorySalesRollup,
+    Order,
+    OrderItem,
+    ProductSalesRollup,
+)
+from apps.payment.serializers.purchase import PurchaseRequestSerializer
+from apps.products.models import Category, Product
+
+
+def api_client(email, **kwargs):
+    user = User.objects.create_user(email=email, password="secret", **kwargs)
+    client = APIClient()
+    client.force_authenticate(user)
+    client.user = user
+    return client
+
+
+def place_order(user, lines, created_date=None, **kwargs):
+    """Orden pagada con ``lines`` = [(producto, cantidad)]."""
+    kwargs.setdefault("is_paid", True)
+    kwargs.setdefault(
+        "total_amount", sum(product.price * quantity for product, quantity in lines)
+    )
+    kwargs.setdefault("item_count", len(lines))
+    order = Order.objects.create(user=user, **kwargs)
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, product=product, quantity=quantity, price=product.price)
+        for product, quantity in lines
+    )
+    if created_date is not None:
+        # created_date es auto_now_add: se fija después del INSERT
+        Order.objects.filter(pk=order.pk).update(created_date=created_date)
+        order.created_date = created_date
+    return order
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        self.admin = api_client("admin@example.com", is_staff=True)
+        self.buyer = api_client("buyer@example.com")
+        category = Category.objects.create(name="Category")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {number}", price=10, category=category, stock=100
+            )
+            for number in range(3)
+        ]
+        now = timezone.now()
+        for days in range(4):
+            place_order(
+                self.buyer.user,
+                [(product, 1) for product in self.products],
+                created_date=now - timedelta(days=days),
+                is_paid=days != 3,
+            )
+
+    def test_filters_and_embedded_items(self):
+        since = (timezone.now() - timedelta(days=1, hours=12)).isoformat()
+        response = self.admin.get(
+            "/payment/orders/", {"created_date_after": since, "include": "items"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(len(response.data["results"][0]["items"]), 3)
+
+        response = self.admin.get("/payment/orders/", {"is_paid": "false"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_items_are_prefetched_for_the_whole_page(self):
+        # Órdenes con su usuario y una consulta para todas las líneas
+        with self.assertNumQueries(2):
+            response = self.admin.get("/payment/orders/", {"include": "items"})
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_only_admins_list_orders(self):
+        self.assertEqual(self.buyer.get("/payment/orders/").status_code, 403)
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.buyer = api_client("buyer@example.com")
+        other = api_client("other@example.com")
+        category = Category.objects.create(name="Category")
+        self.product = Product.objects.create(
+            name="Product", price=10, category=category, stock=100
+        )
+        now = timezone.now()
+        self.orders = [
+            place_order(
+                self.buyer.user,
+                [(self.product, quantity)],
+                created_date=now - timedelta(hours=quantity),
+            )
+            for quantity in range(1, 5)
+        ]
+        place_order(other.user, [(self.product, 1)])
+
+    def test_own_orders_newest_first_with_lines_and_total(self):
+        # Órdenes y una consulta para todas sus líneas
+        with self.assertNumQueries(2):
+            response = self.buyer.get("/payment/my-orders/")
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual(
+            [order["id"] for order in results], [order.pk for order in self.orders]
+        )
+        self.assertEqual(results[1]["total"], "20.00")
+        self.assertEqual(results[1]["items"][0]["product_name"], "Product")
+
+    def test_pages_by_cursor(self):
+        response = self.buyer.get("/payment/my-orders/", {"page_size": 3})
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.buyer.get(response.data["next"])
+        self.assertEqual(
+            [order["id"] for order in response.data["results"]], [self.orders[3].pk]
+        )
+
+
+class OrderTotalsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.buyer = api_client("buyer@example.com", first_name="Buyer")
+        category = Category.objects.create(name="Category")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {number}", price=price, category=category, stock=10
+            )
+            for number, price in enumerate([10, 25])
+        ]
+
+    def test_purchase_stores_totals_on_the_order(self):
+        response = self.buyer.post(
+            "/payment/purchase/",
+            {
+                "items": [
+                    {"product_name": "Product 0", "quantity": 2},
+                    {"product_name": "Product 1", "quantity": 1},
+                ],
+                "payment_amount": "50",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual(order.total_amount, 45)
+        self.assertEqual(order.item_count, 2)
+        self.assertEqual(order.paid_amount, 50)
+        self.assertEqual(order.change, 5)
+
+    def test_backfill_recomputes_totals(self):
+        order = place_order(self.buyer.user, [(self.products[0], 3)])
+        Order.objects.filter(pk=order.pk).update(total_amount=0, item_count=0)
+        empty = place_order(self.buyer.user, [], total_amount=99)
+
+        call_command("backfill_order_totals", batch_size=1, stdout=io.StringIO())
+
+        order.refresh_from_db()
+        empty.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (30, 1))
+        self.assertEqual((empty.total_amount, empty.item_count), (0, 0))
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.admin = api_client("admin@example.com", is_staff=True)
+        category = Category.objects.create(name="Category")
+        self.first, self.second = [
+            Product.objects.create(
+                name=name, price=price, category=category, stock=100
+            )
+            for name, price in [("First", 10), ("Second", 4)]
+        ]
+        self.day = timezone.make_aware(datetime(2026, 3, 2))
+        self.sales = [
+            (self.day + timedelta(hours=10, minutes=15), [(self.first, 1)]),
+            (self.day + timedelta(hours=10, minutes=45), [(self.first, 2)]),
+            (self.day + timedelta(hours=12), [(self.first, 1), (self.second, 5)]),
+        ]
+
+    def record_sales(self):
+        for created_date, lines in self.sales:
+            order = place_order(self.admin.user, lines, created_date=created_date)
+            with self.captureOnCommitCallbacks(execute=True):
+                rollups.record_order(order, order.items.select_related("product"))
+
+    def rollup_rows(self):
+        return sorted(
+            ProductSalesRollup.objects.values_list(
+                "grain", "bucket", "product_id", "quantity", "revenue", "line_count"
+            )
+        )
+
+    def test_orders_in_the_same_bucket_are_added_up(self):
+        self.record_sales()
+        hour = ProductSalesRollup.objects.get(
+            grain="hour", bucket=self.day + timedelta(hours=10), product=self.first
+        )
+        self.assertEqual((hour.quantity, hour.revenue, hour.line_count), (3, 30, 2))
+        day = CategorySalesRollup.objects.get(grain="day", bucket=self.day)
+        self.assertEqual((day.quantity, day.revenue, day.line_count), (9, 60, 4))
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        self.record_sales()
+        incremental = self.rollup_rows()
+        ProductSalesRollup.objects.update(quantity=0)
+
+        call_command("rebuild_sales_rollups", batch_size=2, stdout=io.StringIO())
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def test_report_reads_series_and_top_sellers(self):
+        self.record_sales()
+        response = self.admin.get(
+            "/payment/reports/sales/",
+            {"start": "2026-03-02", "end": "2026-03-03", "grain": "hour"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["series"]), 2)
+        self.assertEqual(response.data["top"][0]["product_id"], self.first.pk)
+        self.assertEqual(response.data["totals"]["quantity"], 9)
+
+        response = self.admin.get(
+            "/payment/reports/sales/", {"start": "2026-03-02", "end": "2026-03-01"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class PurchaseValidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Category")
+        for number in range(10):
+            Product.objects.create(
+                name=f"Product {number}", price=10, category=category, stock=5
+            )
+
+    def test_products_are_resolved_in_one_query(self):
+        items = [
+            {"product_name": f"PRODUCT {number}", "quantity": 1}
+            for number in range(10)
+        ]
+        serializer = PurchaseRequestSerializer(
+            data={"items": items, "payment_amount": "100"}
+        )
+        # Productos por nombre, y saldo base más movimientos de todos a la vez
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(serializer.validated_data["validated_items"]), 10)
+
+    def test_unknown_and_short_stock_items(self):
+        serializer = PurchaseRequestSerializer(
+            data={
+                "items": [
+                    {"product_name": "Product 1", "quantity": 8},
+                    {"product_name": "Missing", "quantity": 1},
+                ],
+                "payment_amount": "100",
+            }
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["items"][0], {})
+        self.assertIn("product_name", serializer.errors["items"][1])
+
+        serializer = PurchaseRequestSerializer(
+            data={
+                "items": [{"product_name": "product 1", "quantity": 8}],
+                "payment_amount": "100",
+            }
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertTrue(serializer.validated_data["is_partial"])
+        self.assertEqual(serializer.validated_data["validated_items"][0]["quantity"], 5)
+
+
+@override_settings(
+    FLASH_SALE_BATCH_SIZE=2,
+    FLASH_SALE_MAX_QUEUE=1,
+    FLASH_SALE_MAX_WAIT=0,
+)
+class FlashSaleAdmissionTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        category = Category.objects.create(name="Category")
+        self.product = Product.objects.create(
+            name="Product", price=10, category=category, stock=100, flash_sale=True
+        )
+
+    def test_rejected_requests_do_not_free_checkout_slots(self):
+        with ExitStack() as buyers:
+            for number in range(2):
+                buyers.enter_context(admission.admit({self.product.pk: 1}))
+
+            for number in range(5):
+                with self.assertRaises(admission.Overloaded):
+                    with admission.admit({self.product.pk: 1}):
+                        pass
+
+            # El lote sigue lleno mientras los dos primeros están en checkout
+            with self.assertRaises(admission.Overloaded):
+                with admission.admit({self.product.pk: 1}):
+                    pass
+
+        with admission.admit({self.product.pk: 1}) as admitted:
+            self.assertEqual(admitted.reserved, {self.product.pk: 1})
+
+    @override_settings(FLASH_SALE_MAX_WAIT=0.5)
+    def test_rejections_do_not_admit_waiting_buyers(self):
+        results = []
+
+        def wait_in_queue():
+            buyer = admission.Admission()
+            try:
+                buyer.enter(self.product.pk)
+                results.append("admitted")
+                buyer.release()
+            except admission.Overloaded:
+                results.append("overloaded")
+
+        with ExitStack() as buyers:
+            for number in range(2):
+                buyers.enter_context(admission.admit({self.product.pk: 1}))
+
+            waiter = threading.Thread(target=wait_in_queue)
+            waiter.start()
+            time.sleep(0.1)
+            # La cola (una plaza) ya está ocupada: se rechazan sin esperar
+            for number in range(5):
+                with self.assertRaises(admission.Overloaded):
+                    with admission.admit({self.product.pk: 1}):
+                        pass
+            waiter.join()
+
+        self.assertEqual(results, ["overloaded"])
+
+    def test_unsold_units_are_returned(self):
+        with admission.admit({self.product.pk: 10}) as admitted:
+            admitted.sold = {self.product.pk: 4}
+
+        with admission.admit({self.product.pk: 200}) as admitted:
+            self.assertEqual(admitted.reserved, {self.product.pk: 96})
+            admitted.sold = {self.product.pk: 96}
+
+        with self.assertRaises(admission.SoldOut):
+            with admission.admit({self.product.pk: 1}):
+                pass
+
+    @override_settings(FLASH_SALE_BATCH_SIZE=1, FLASH_SALE_MAX_WAIT=2)
+    def test_buyers_are_admitted_in_arrival_order(self):
+        order = []
+
+        def buy(name):
+            buyer = admission.Admission()
+            buyer.enter(self.product.pk)
+            order.append(name)
+            time.sleep(0.1)
+            buyer.release()
+
+        holder = admission.Admission()
+        holder.enter(self.product.pk)
+        first = threading.Thread(target=buy, args=("first",))
+        first.start()
+        time.sleep(0.1)
+
+        # Quien llega justo al liberarse la plaza no adelanta al que espera
+        holder.release()
+        buy("late")
+        first.join()
+
+        self.assertEqual(order, ["first", "late"])
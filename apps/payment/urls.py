@@ -2,7 +2,9 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from apps.payment.views.history import OrderHistoryView
 from apps.payment.views.purchase import PurchaseView
+from apps.payment.views.report import SalesReportView
 from apps.payment.views.order import OrderViewSet
 
 router = DefaultRouter()
@@ -14,5 +16,7 @@ router.register(
 
 urlpatterns = [
     path("purchase/", PurchaseView.as_view(), name="purchase"),
+    path("my-orders/", OrderHistoryView.as_view(), name="order-history"),
+    path("reports/sales/", SalesReportView.as_view(), name="sales-report"),
     path("", include(router.urls)),
 ]
@@ -1,2 +1,4 @@
+from apps.payment.views.history import OrderHistoryView
 from apps.payment.views.order import OrderViewSet
 from apps.payment.views.purchase import PurchaseView
+from apps.payment.views.report import SalesReportView
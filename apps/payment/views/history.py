@@ -0,0 +1,70 @@
+from django.db.models import Prefetch
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+
+from apps.common.pagination import KeysetPagination
+from apps.payment.models import Order, OrderItem
+from apps.payment.serializers.order import OrderHistorySerializer
+
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi as oa
+
+
+class OrderHistoryView(generics.ListAPIView):
+    """
+    Order history of the authenticated user, newest first.
+
+    Each order carries its lines and its total, so the "My orders" page needs
+    a single request per page instead of one per order.
+    """
+
+    serializer_class = OrderHistorySerializer
+    pagination_class = KeysetPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # El total sale de la columna desnormalizada de Order
+        return (
+            Order.objects.filter(user=self.request.user, is_active=True)
+            .prefetch_related(
+                Prefetch(
+                    "items",
+                    queryset=OrderItem.objects.select_related("product").order_by("id"),
+                )
+            )
+        )
+
+    @swagger_auto_schema(
+        operation_description=_("Historial de órdenes del usuario autenticado"),
+        manual_parameters=[
+            oa.Parameter(
+                name="Authorization",
+                in_=oa.IN_HEADER,
+                description="Bearer <access_token>",
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+            oa.Parameter(
+                name="cursor",
+                in_=oa.IN_QUERY,
+                description=_("Opaque cursor taken from the next/previous links"),
+                type=oa.TYPE_STRING,
+            ),
+            oa.Parameter(
+                name="page_size",
+                in_=oa.IN_QUERY,
+                description=_("Number of orders per page (max 100)"),
+                type=oa.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: oa.Response(
+                description=_("Órdenes con sus líneas y total"),
+                schema=OrderHistorySerializer(many=True),
+            ),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
@@ -1,12 +1,15 @@
 # apps/payment/viewsets.py
 from django.http import Http404
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework.exceptions import NotFound
 from rest_framework import viewsets
 from rest_framework.permissions import IsAdminUser
-from apps.payment.models import Order
-from apps.payment.serializers.order import OrderSerializer
+from apps.payment.filters.order import OrderFilter
+from apps.payment.models import Order, OrderItem
+from apps.payment.serializers.order import OrderSerializer, OrderWithItemsSerializer
+from apps.common.pagination import KeysetPagination
 from apps.common.views import BaseModelViewSet  # Tu vista base personalizada
 
 from drf_yasg.utils import swagger_auto_schema
@@ -19,11 +22,37 @@ class OrderViewSet(BaseModelViewSet):
     Only admins can view or modify orders.
     """
 
-    queryset = Order.objects.all()
+    queryset = Order.objects.select_related("user")
     serializer_class = OrderSerializer
+    filterset_class = OrderFilter
+    pagination_class = KeysetPagination
     # Todos los métodos requieren autenticación de admin por defecto
     permission_classes = [IsAdminUser]
 
+    def include_items(self):
+        # ?include=items añade las líneas con sus productos
+        if self.action not in ["list", "retrieve"]:
+            return False
+        include = self.request.query_params.get("include", "")
+        return "items" in include.split(",")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.include_items():
+            # Una consulta más para todas las líneas de la página, con su producto
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "items",
+                    queryset=OrderItem.objects.select_related("product").order_by("id"),
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.include_items():
+            return OrderWithItemsSerializer
+        return super().get_serializer_class()
+
     def get_permissions(self):
         if self.action in ["list", "retrieve", "update", "partial_update"]:
             self.permission_classes = [IsAdminUser]
@@ -45,10 +74,29 @@ class OrderViewSet(BaseModelViewSet):
                 type=oa.TYPE_STRING,
                 required=True,
             ),
+            oa.Parameter(
+                name="include",
+                in_=oa.IN_QUERY,
+                description=_("Use 'items' to embed the order lines"),
+                type=oa.TYPE_STRING,
+            ),
+            oa.Parameter(
+                name="cursor",
+                in_=oa.IN_QUERY,
+                description=_("Opaque cursor taken from the next/previous links"),
+                type=oa.TYPE_STRING,
+            ),
+            oa.Parameter(
+                name="page_size",
+                in_=oa.IN_QUERY,
+                description=_("Number of orders per page (max 100)"),
+                type=oa.TYPE_INTEGER,
+            ),
         ],
         responses={
             200: oa.Response(
-                description=_("List of orders"), schema=OrderSerializer(many=True)
+                description=_("Paginated list of orders"),
+                schema=OrderSerializer(many=True),
             ),
             403: oa.Response(
                 description=_("Forbidden"),
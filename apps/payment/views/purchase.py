@@ -5,12 +5,21 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
+from apps.common.idempotency import (
+    IDEMPOTENCY_KEY_PARAMETER,
+    idempotent,
+    stored_response,
+)
+from apps.payment import admission
 from apps.payment.models import Order, OrderItem
+from apps.payment.rollups import record_order
 from apps.payment.serializers.order import OrderSerializer
 from apps.payment.serializers.purchase import PurchaseRequestSerializer
+from apps.products import inventory
 from apps.manager.models import User
 
 from drf_yasg.utils import swagger_auto_schema
@@ -41,7 +50,7 @@ class PurchaseView(APIView):
 
     @swagger_auto_schema(
         operation_description=_("Crear una nueva orden de compra"),
-        manual_parameters=AUTH_HEADER,
+        manual_parameters=AUTH_HEADER + [IDEMPOTENCY_KEY_PARAMETER],
         request_body=PurchaseRequestSerializer,
         responses={
             201: oa.Response(description=_("Compra realizada con éxito")),
@@ -59,10 +68,19 @@ class PurchaseView(APIView):
                     properties={"detail": oa.Schema(type=oa.TYPE_STRING)},
                 ),
             ),
+            409: oa.Response(description=_("Producto en oferta relámpago agotado")),
+            429: oa.Response(
+                description=_("Oferta relámpago saturada; reintentar tras Retry-After")
+            ),
         },
     )
     def post(self, request):
         """Crear una nueva orden"""
+        # Un reintento ya resuelto se responde sin volver a pedir turno
+        replayed = stored_response(request)
+        if replayed is not None:
+            return replayed
+
         serializer = PurchaseRequestSerializer(data=request.data)
 
         if not serializer.is_valid():
@@ -70,50 +88,91 @@ class PurchaseView(APIView):
 
         validated_data = serializer.validated_data
         validated_items = validated_data["validated_items"]
-        total_price = validated_data["total_price"]
-        payment_amount = validated_data["payment_amount"]
 
         # Crear la orden
         full_name = get_user_fullname(request.user)
         if not full_name:
             raise PermissionDenied("Usuario no autenticado")
 
-        order = Order.objects.create(
-            user=request.user,
-            is_paid=True,
-            created_by=full_name,
-            created_date=timezone.now(),
-        )
+        # Productos en oferta relámpago: se admite o rechaza antes de la BD
+        flash_sale = {}
+        for item in validated_items:
+            product = item["product"]
+            if product.flash_sale:
+                quantity = flash_sale.get(product.pk, 0) + item["quantity"]
+                flash_sale[product.pk] = quantity
+
+        # La espera de turno ocurre antes de abrir la transacción de
+        # idempotencia: no retiene conexión ni bloqueos mientras duerme
+        with admission.admit(flash_sale) as admitted:
+            return self.purchase(request, validated_data, full_name, admitted)
+
+    @idempotent
+    def purchase(self, request, validated_data, full_name, admitted):
+        validated_items = validated_data["validated_items"]
+        total_price = validated_data["total_price"]
+        payment_amount = validated_data["payment_amount"]
 
-        successful_items = []
-        remaining_payment = payment_amount
+        with transaction.atomic():
+            # Bloqueo de inventario por producto; el saldo leído es exacto
+            product_ids = {item["product"].pk for item in validated_items}
+            inventory.lock_products(product_ids)
+            balances = inventory.current_balances(product_ids)
 
-        for item in validated_items:
-            total_cost = item["quantity"] * item["price"]
-
-            if remaining_payment >= total_cost:
-                OrderItem.objects.create(
-                    order=order,
-                    product=item["product"],
-                    quantity=item["quantity"],
-                    price=item["price"],
-                )
-                successful_items.append(
-                    {"product": item["product"].name, "quantity": item["quantity"]}
-                )
-                remaining_payment -= total_cost
+            order_items = []
+            successful_items = []
+            sold = {}
+            remaining_payment = payment_amount
 
-                # Actualizar stock
+            for item in validated_items:
                 product = item["product"]
-                product.stock -= item["quantity"]
-                if product.stock == 0:
-                    product.is_active = False
-                product.save()
-
-        # Guardar updated_by y updated_date (opcional)
-        order.updated_by = full_name
-        order.updated_date = timezone.now()
-        order.save(update_fields=["updated_by", "updated_date"])
+                available = balances[product.pk]
+                if product.pk in admitted.reserved:
+                    # No más de lo concedido por la admisión
+                    available = min(available, admitted.reserved[product.pk])
+                available -= sold.get(product.pk, 0)
+                quantity = min(item["quantity"], available)
+                price = item["price"]
+                total_cost = quantity * price
+
+                if quantity > 0 and remaining_payment >= total_cost:
+                    order_items.append(
+                        OrderItem(product=product, quantity=quantity, price=price)
+                    )
+                    successful_items.append(
+                        {"product": product.name, "quantity": quantity}
+                    )
+                    remaining_payment -= total_cost
+                    sold[product.pk] = sold.get(product.pk, 0) + quantity
+
+            # Orden, totales y líneas se escriben juntos o no se escriben
+            now = timezone.now()
+            order = Order.objects.create(
+                user=request.user,
+                is_paid=True,
+                created_by=full_name,
+                created_date=now,
+                updated_by=full_name,
+                updated_date=now,
+                total_amount=payment_amount - remaining_payment,
+                item_count=len(order_items),
+                paid_amount=payment_amount,
+                change=remaining_payment,
+            )
+            for order_item in order_items:
+                order_item.order = order
+            OrderItem.objects.bulk_create(order_items)
+            record_order(order, order_items)
+
+            # Ventas como movimientos del inventario, sin reescribir Product
+            inventory.record(
+                [
+                    (product_id, "sale", -quantity, f"order:{order.pk}", full_name)
+                    for product_id, quantity in sold.items()
+                ],
+                balances,
+            )
+        admitted.sold = sold
 
         return Response(
             {
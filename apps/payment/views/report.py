@@ -0,0 +1,135 @@
+from django.db.models import Sum
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.payment.models import CategorySalesRollup, ProductSalesRollup
+from apps.payment.serializers.report import SalesReportQuerySerializer
+
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi as oa
+
+ROLLUPS = {
+    "product": (ProductSalesRollup, "product_id"),
+    "category": (CategorySalesRollup, "category_id"),
+}
+
+
+def _totals(queryset):
+    return queryset.annotate(
+        units=Sum("quantity"), total_revenue=Sum("revenue"), lines=Sum("line_count")
+    )
+
+
+def _row(row, *keys):
+    data = {key: row[key] for key in keys}
+    data.update(
+        quantity=row["units"],
+        revenue=row["total_revenue"],
+        line_count=row["lines"],
+    )
+    return data
+
+
+class SalesReportView(APIView):
+    """
+    Sales by period read from the rollup tables only.
+
+    Returns the time series for the range (of one product or category when
+    ``id`` is given) and the top sellers by revenue.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description=_("Reporte de ventas por periodo desde los rollups"),
+        manual_parameters=[
+            oa.Parameter(
+                name="Authorization",
+                in_=oa.IN_HEADER,
+                description="Bearer <access_token>",
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+            oa.Parameter(
+                name="start",
+                in_=oa.IN_QUERY,
+                description=_("Inicio del rango (ISO 8601 o YYYY-MM-DD)"),
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+            oa.Parameter(
+                name="end",
+                in_=oa.IN_QUERY,
+                description=_("Fin del rango, excluido"),
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+            oa.Parameter(
+                name="grain",
+                in_=oa.IN_QUERY,
+                description=_("hour o day"),
+                type=oa.TYPE_STRING,
+                enum=["hour", "day"],
+            ),
+            oa.Parameter(
+                name="by",
+                in_=oa.IN_QUERY,
+                description=_("product o category"),
+                type=oa.TYPE_STRING,
+                enum=["product", "category"],
+            ),
+            oa.Parameter(
+                name="id",
+                in_=oa.IN_QUERY,
+                description=_("Limitar la serie a un producto o categoría"),
+                type=oa.TYPE_INTEGER,
+            ),
+            oa.Parameter(
+                name="top",
+                in_=oa.IN_QUERY,
+                description=_("Número de elementos en el ranking (máx. 100)"),
+                type=oa.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: oa.Response(description=_("Serie temporal, ranking y totales")),
+            400: oa.Response(description=_("Parámetros inválidos")),
+        },
+    )
+    def get(self, request):
+        serializer = SalesReportQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+
+        model, key = ROLLUPS[params["by"]]
+        queryset = model.objects.filter(
+            grain=params["grain"],
+            bucket__gte=params["start"],
+            bucket__lt=params["end"],
+        )
+        if "id" in params:
+            queryset = queryset.filter(**{key: params["id"]})
+
+        series = _totals(queryset.values("bucket").order_by("bucket"))
+        top = _totals(queryset.values(key)).order_by("-total_revenue", key)
+        totals = queryset.aggregate(
+            units=Sum("quantity"), total_revenue=Sum("revenue"), lines=Sum("line_count")
+        )
+
+        return Response(
+            {
+                "grain": params["grain"],
+                "by": params["by"],
+                "start": params["start"],
+                "end": params["end"],
+                "series": [_row(row, "bucket") for row in series],
+                "top": [_row(row, key) for row in top[: params["top"]]],
+                "totals": _row(totals),
+            },
+            status=status.HTTP_200_OK,
+        )
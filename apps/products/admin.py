@@ -1,6 +1,12 @@
+from django import forms
 from django.contrib import admin
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
+from apps.common.views import get_user_fullname
+from apps.products import inventory
+from apps.products.cache import catalog_cache
 from apps.products.models.category import Category
+from apps.products.models.inventory import InventoryMovement
 from apps.products.models.product import Product
 
 
@@ -54,21 +60,41 @@ class CategoryProductAdmin(admin.ModelAdmin):
     description_short.short_description = _("Description")
 
 
+class ProductAdminForm(forms.ModelForm):
+    # Product.stock es la base compactada; el saldo se cambia con un ajuste
+    available_stock = forms.IntegerField(
+        label=_("Available stock"), required=False, min_value=0
+    )
+
+    class Meta:
+        model = Product
+        fields = "__all__"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields["available_stock"].initial = inventory.current_balances(
+                [self.instance.pk]
+            )[self.instance.pk]
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
+    form = ProductAdminForm
     list_display = (
         "name",
         "category",
         "price",
-        "stock",
+        "balance",
         "status",
         "is_active",
         "created_date",
     )
-    list_filter = ("is_active", "status", "category")
+    list_filter = ("is_active", "status", "flash_sale", "category")
     search_fields = ("name", "description", "category_product__name")
     autocomplete_fields = ["category"]
     readonly_fields = (
+        "stock",
         "created_date",
         "created_by",
         "updated_date",
@@ -81,8 +107,8 @@ class ProductAdmin(admin.ModelAdmin):
             _("Basic Information"),
             {"fields": ("name", "description", "category", "image")},
         ),
-        (_("Pricing & Stock"), {"fields": ("price", "stock")}),
-        (_("Status"), {"fields": ("is_active", "status")}),
+        (_("Pricing & Stock"), {"fields": ("price", "available_stock", "stock")}),
+        (_("Status"), {"fields": ("is_active", "status", "flash_sale")}),
         (
             _("Audit Information"),
             {
@@ -101,13 +127,29 @@ class ProductAdmin(admin.ModelAdmin):
     ordering = ("-created_date",)
     actions = ["make_inactive", "make_active"]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        target = form.cleaned_data.get("available_stock")
+        if target is not None and "available_stock" in form.changed_data:
+            inventory.set_balance(
+                obj, target, "admin", get_user_fullname(request.user) or ""
+            )
+
+    def balance(self, obj):
+        return inventory.cached_balances([obj.pk])[obj.pk]
+
+    balance.short_description = _("Available stock")
+
     def make_inactive(self, request, queryset):
         queryset.update(is_active=False)
+        # update() no dispara señales
+        transaction.on_commit(catalog_cache.bump_version)
 
     make_inactive.short_description = _("Mark selected products as inactive")
 
     def make_active(self, request, queryset):
         queryset.update(is_active=True)
+        transaction.on_commit(catalog_cache.bump_version)
 
     make_active.short_description = _("Mark selected products as active")
 
@@ -116,3 +158,30 @@ class ProductAdmin(admin.ModelAdmin):
 
     category.short_description = _("Category")
     category.admin_order_field = "category_product__name"
+
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(admin.ModelAdmin):
+    # Libro de solo anexado: las correcciones son movimientos nuevos
+    list_display = (
+        "product",
+        "kind",
+        "delta",
+        "reference",
+        "created_by",
+        "created_at",
+        "compacted",
+    )
+    list_filter = ("kind", "compacted", "created_at")
+    search_fields = ("product__name", "reference")
+    list_select_related = ("product",)
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
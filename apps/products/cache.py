@@ -0,0 +1,7 @@
+from django.conf import settings
+
+from apps.common.cache import ResponseCache
+
+catalog_cache = ResponseCache(
+    "catalog", alias=getattr(settings, "CATALOG_CACHE_ALIAS", "default")
+)
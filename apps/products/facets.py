@@ -0,0 +1,102 @@
+"""
+Catalog facets.
+
+Counts per category, status and price bucket for the rows of a filtered
+product queryset, computed in a single ``GROUPING SETS`` query over the
+queryset's own SQL, so any ``ProductFilter`` combination (search included)
+is honoured without one query per facet.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+
+from apps.products.filters.product import ProductFilter
+
+# Límites de los tramos de precio; width_bucket usa [límite, siguiente)
+DEFAULT_PRICE_BUCKETS = [0, 10, 25, 50, 100, 250, 500, 1000]
+
+FACETS_SQL = """
+SELECT GROUPING(facet_category) = 0,
+       GROUPING(facet_status) = 0,
+       GROUPING(facet_bucket) = 0,
+       facet_category,
+       facet_category_name,
+       facet_status,
+       facet_bucket,
+       COUNT(*)
+FROM (
+    SELECT filtered.*,
+           width_bucket(filtered.facet_price, %s::numeric[]) AS facet_bucket
+    FROM ({query}) AS filtered
+) AS facet_rows
+GROUP BY GROUPING SETS (
+    (facet_category, facet_category_name),
+    (facet_status),
+    (facet_bucket),
+    ()
+)
+"""
+
+
+def get_price_buckets():
+    edges = getattr(settings, "CATALOG_PRICE_BUCKETS", DEFAULT_PRICE_BUCKETS)
+    return [Decimal(str(edge)) for edge in edges]
+
+
+def signature(params):
+    """Parámetros de ProductFilter presentes, normalizados para la clave."""
+    return sorted(
+        (name, value)
+        for name in ProductFilter.base_filters
+        for value in params.getlist(name)
+        if value != ""
+    )
+
+
+def compute(queryset):
+    """Devuelve {"total", "categories", "statuses", "prices"} para el queryset."""
+    edges = get_price_buckets()
+    rows_queryset = queryset.order_by().values(
+        facet_category=F("category_id"),
+        facet_category_name=F("category__name"),
+        facet_status=F("status"),
+        facet_price=F("price"),
+    )
+    query, params = rows_queryset.query.sql_with_params()
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(FACETS_SQL.format(query=query), [edges, *params])
+        rows = cursor.fetchall()
+
+    total = 0
+    categories, statuses, prices = [], [], []
+    for row in rows:
+        by_category, by_status, by_price, category, name, status, bucket, count = row
+        if by_category:
+            categories.append({"id": category, "name": name, "count": count})
+        elif by_status:
+            statuses.append({"status": status, "count": count})
+        elif by_price:
+            prices.append(
+                {
+                    # Tramo 0: por debajo del primer límite; len(edges): sin tope
+                    "min": edges[bucket - 1] if bucket > 0 else None,
+                    "max": edges[bucket] if bucket < len(edges) else None,
+                    "count": count,
+                }
+            )
+        else:
+            total = count
+
+    categories.sort(key=lambda facet: (-facet["count"], facet["name"]))
+    statuses.sort(key=lambda facet: -facet["count"])
+    prices.sort(key=lambda facet: (facet["min"] is not None, facet["min"] or 0))
+    return {
+        "total": total,
+        "categories": categories,
+        "statuses": statuses,
+        "prices": prices,
+    }
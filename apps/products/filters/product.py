@@ -1,10 +1,12 @@
 import django_filters
 from apps.products.models.category import Category
 from apps.products.models.product import Product, STATUS_CHOICES
+from apps.products.search import search_products
 
 
 class ProductFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_expr="icontains")
+    search = django_filters.CharFilter(method="filter_search")
     min_price = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
     max_price = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
     status = django_filters.ChoiceFilter(choices=STATUS_CHOICES)
@@ -13,4 +15,18 @@ class ProductFilter(django_filters.FilterSet):
 
     class Meta:
         model = Product
-        fields = ["name", "status", "category", "is_active", "min_price", "max_price"]
+        fields = [
+            "name",
+            "search",
+            "status",
+            "category",
+            "is_active",
+            "min_price",
+            "max_price",
+        ]
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_products(queryset, value)
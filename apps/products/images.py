@@ -0,0 +1,148 @@
+"""
+Product image variants.
+
+Each uploaded image gets fixed-size variants (``PRODUCT_IMAGE_VARIANTS``) in
+every format of ``PRODUCT_IMAGE_FORMATS``, stored next to the original as
+``<name>_<variant>.<ext>``. Decoding and resizing run in a process pool so
+they neither hold the GIL of the web worker nor delay the response; the
+parent process only reads the original and writes the results through the
+image field's storage.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+_executor = None
+
+
+def variant_name(name, variant, image_format):
+    root, ext = os.path.splitext(name)
+    return f"{root}_{variant}.{EXTENSIONS[image_format]}"
+
+
+def variant_names(name):
+    return {
+        variant: {
+            image_format: variant_name(name, variant, image_format)
+            for image_format in settings.PRODUCT_IMAGE_FORMATS
+        }
+        for variant in settings.PRODUCT_IMAGE_VARIANTS
+    }
+
+
+def variant_urls(image):
+    """
+    URLs de las variantes de un ImageFieldFile, o None si no hay imagen.
+    Mientras las variantes no existen (pendientes o fallidas) todas apuntan a
+    la imagen original.
+    """
+    if not image:
+        return None
+    ready = has_variants(image.storage, image.name)
+    return {
+        variant: {
+            image_format: image.storage.url(name) if ready else image.url
+            for image_format, name in formats.items()
+        }
+        for variant, formats in variant_names(image.name).items()
+    }
+
+
+def render_variants(data, variants, formats, quality):
+    """
+    Genera las variantes de una imagen. Se ejecuta en otro proceso: recibe y
+    devuelve bytes, sin tocar Django. Devuelve {(variant, formato): bytes}.
+    """
+    from PIL import Image, ImageOps
+
+    rendered = {}
+    for variant, size in variants.items():
+        with Image.open(io.BytesIO(data)) as image:
+            # Con JPEG decodifica directamente a una escala reducida
+            image.draft("RGB", size)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            for image_format in formats:
+                frame = image
+                if image_format == "jpeg" and image.mode != "RGB":
+                    frame = image.convert("RGB")
+                buffer = io.BytesIO()
+                frame.save(
+                    buffer, format=image_format.upper(), quality=quality, optimize=True
+                )
+                rendered[(variant, image_format)] = buffer.getvalue()
+    return rendered
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: no hereda hilos ni conexiones del proceso web
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PRODUCT_IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def render_args(storage, name):
+    with storage.open(name, "rb") as original:
+        data = original.read()
+    return (
+        data,
+        dict(settings.PRODUCT_IMAGE_VARIANTS),
+        list(settings.PRODUCT_IMAGE_FORMATS),
+        settings.PRODUCT_IMAGE_QUALITY,
+    )
+
+
+def save_variants(storage, name, rendered):
+    # En el orden de render_variants; la última es la que mira has_variants
+    for (variant, image_format), data in rendered.items():
+        target = variant_name(name, variant, image_format)
+        if hasattr(storage, "save_as"):
+            # ContentHashStorage renombraría por hash; la variante tiene nombre fijo
+            storage.save_as(target, ContentFile(data))
+            continue
+        # Mismo nombre que el original: se sobrescribe en lugar de renombrar
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(data))
+
+
+def has_variants(storage, name):
+    # save_variants escribe esta variante la última: si existe, existen todas
+    variant = [*settings.PRODUCT_IMAGE_VARIANTS][-1]
+    image_format = settings.PRODUCT_IMAGE_FORMATS[-1]
+    return storage.exists(variant_name(name, variant, image_format))
+
+
+def schedule_variants(image):
+    """Encola la generación de variantes de un ImageFieldFile en el pool."""
+    storage, name = image.storage, image.name
+    future = get_executor().submit(render_variants, *render_args(storage, name))
+
+    def done(future):
+        # Aquí y no arriba: los procesos del pool importan este módulo
+        from apps.products.cache import catalog_cache
+
+        try:
+            save_variants(storage, name, future.result())
+        except Exception:
+            logger.exception("No se pudieron generar las variantes de %s", name)
+            return
+        # Las respuestas cacheadas hasta ahora apuntan a la imagen original
+        catalog_cache.bump_version()
+
+    future.add_done_callback(done)
+    return future
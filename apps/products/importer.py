@@ -0,0 +1,331 @@
+"""
+Streaming product import from CSV or JSONL.
+
+Rows are parsed lazily and handled in chunks: each chunk is validated in
+Python, checked against existing names with a single query and written with
+``bulk_create``/``bulk_update`` in its own transaction, so memory and
+transaction size stay bounded whatever the size of the feed. Products are
+matched by name; stock of existing products is set through inventory
+adjustments so the ledger stays consistent.
+"""
+
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from apps.products import inventory
+from apps.products.cache import catalog_cache
+from apps.products.models.category import Category
+from apps.products.models.product import STATUS_CHOICES, Product
+from apps.products.search import refresh_search_vector
+
+FORMATS = ["csv", "jsonl"]
+MODES = ["upsert", "create"]
+STATUSES = {choice[0] for choice in STATUS_CHOICES}
+TRUE_VALUES = {"1", "true", "yes", "si", "sí"}
+FALSE_VALUES = {"0", "false", "no"}
+# Columnas que se copian a los productos existentes (stock va por el inventario)
+UPDATE_FIELDS = ["description", "category", "price", "status", "is_active"]
+# Valores de los productos nuevos cuando falta la columna
+CREATE_DEFAULTS = {"description": "", "stock": 0, "status": "active", "is_active": True}
+# Columna -> campo; sin ellas no se puede crear un producto
+REQUIRED_ON_CREATE = {"price": "price", "category": "category_id"}
+MAX_PRICE = Decimal(10**8)
+
+
+def detect_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_rows(stream, file_format):
+    """
+    Genera ``(número de fila, dict)`` desde un flujo binario, sin cargarlo.
+
+    Se decodifica línea a línea: una fila que no es UTF-8 válido se marca como
+    inválida y la lectura sigue. Un CSV que ya no puede analizarse (p. ej. un
+    byte nulo) lanza ``FileError``.
+    """
+    if file_format == "csv":
+        undecodable = []
+
+        def lines():
+            for number, line in enumerate(stream):
+                try:
+                    yield line.decode("utf-8-sig" if number == 0 else "utf-8")
+                except UnicodeDecodeError:
+                    undecodable.append(number)
+                    yield line.decode("utf-8", errors="replace")
+
+        number = 0
+        try:
+            for number, row in enumerate(csv.DictReader(lines()), start=1):
+                if undecodable:
+                    undecodable.clear()
+                    row = {"__invalid__": _("Invalid UTF-8 text.")}
+                yield number, row
+        except csv.Error as exc:
+            raise FileError(number + 1, exc)
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line.decode("utf-8-sig"))
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            row = {"__invalid__": _("Invalid JSON line.")}
+        yield number, row
+
+
+class FileError(Exception):
+    """El fichero no puede seguir leyéndose a partir de la fila ``number``."""
+
+    def __init__(self, number, error):
+        super().__init__(str(error))
+        self.number = number
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _flag(value, default):
+    value = _text(value).lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError
+
+
+class ProductImporter:
+    """
+    Importa filas de productos por lotes y acumula el informe de errores.
+
+    ``categories`` es un mapa nombre en minúsculas -> id cargado una sola vez;
+    los ids numéricos en la columna ``category`` también se aceptan.
+    """
+
+    def __init__(self, batch_size=1000, mode="upsert", user_name="", max_errors=None):
+        self.batch_size = batch_size
+        self.mode = mode
+        self.user_name = user_name
+        self.max_errors = max_errors
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+        self.categories = {}
+        self.category_ids = set()
+        for pk, name in Category.objects.filter(is_active=True).values_list(
+            "pk", "name"
+        ):
+            self.categories.setdefault(name.strip().lower(), pk)
+            self.category_ids.add(pk)
+
+    def run(self, rows):
+        rows = iter(rows)
+        chunk = []
+        try:
+            while True:
+                chunk = []
+                # Fila a fila: si el fichero falla, lo ya leído se importa
+                for row in islice(rows, self.batch_size):
+                    chunk.append(row)
+                if not chunk:
+                    break
+                self.import_chunk(chunk)
+        except FileError as exc:
+            if chunk:
+                self.import_chunk(chunk)
+            self.add_error(
+                exc.number, {"non_field_errors": _("Unreadable file: %s") % exc}
+            )
+        finally:
+            # bulk_create/bulk_update no disparan señales; los lotes ya
+            # confirmados deben verse aunque la importación falle después
+            catalog_cache.bump_version()
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def add_error(self, number, errors):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({"row": number, "errors": errors})
+
+    def clean(self, row):
+        """
+        Valida una fila sin consultas; devuelve (datos, errores). Solo lleva a
+        ``datos`` las columnas presentes, para no pisar con valores por
+        defecto los campos que el fichero no trae.
+        """
+        if "__invalid__" in row:
+            return None, {"non_field_errors": row["__invalid__"]}
+
+        errors = {}
+        data = {}
+
+        name = _text(row.get("name"))
+        if len(name) < 3:
+            errors["name"] = _("Name must be at least 3 characters long.")
+        elif len(name) > 255:
+            errors["name"] = _("Name cannot exceed 255 characters.")
+        data["name"] = name
+
+        if "price" in row:
+            try:
+                price = Decimal(_text(row["price"]))
+                if not price.is_finite() or price <= 0:
+                    raise InvalidOperation
+                data["price"] = price.quantize(Decimal("0.01"))
+                # max_digits=10, decimal_places=2
+                if data["price"] >= MAX_PRICE:
+                    errors["price"] = _(
+                        "Ensure that there are no more than 8 digits before the "
+                        "decimal point."
+                    )
+            except InvalidOperation:
+                errors["price"] = _("Price must be greater than zero.")
+
+        if "stock" in row:
+            try:
+                data["stock"] = int(_text(row["stock"]) or 0)
+                if data["stock"] < 0:
+                    errors["stock"] = _("Stock cannot be negative.")
+            except ValueError:
+                errors["stock"] = _("A valid integer is required.")
+
+        if "category" in row:
+            category = _text(row["category"])
+            category_id = self.categories.get(category.lower())
+            if category_id is None and category.isdigit():
+                category_id = int(category)
+                if category_id not in self.category_ids:
+                    category_id = None
+            if category_id is None:
+                errors["category"] = _("Unknown category.")
+            data["category_id"] = category_id
+
+        if "status" in row:
+            status = _text(row["status"]) or "active"
+            if status not in STATUSES:
+                errors["status"] = _("Invalid status selected.")
+            data["status"] = status
+
+        if "is_active" in row:
+            try:
+                data["is_active"] = _flag(row["is_active"], True)
+            except ValueError:
+                errors["is_active"] = _("Must be a valid boolean.")
+
+        if "description" in row:
+            data["description"] = _text(row["description"])
+        return data, errors
+
+    def import_chunk(self, chunk):
+        valid = {}
+        for number, row in chunk:
+            data, errors = self.clean(row)
+            if not errors and data["name"] in valid:
+                errors = {"name": _("Duplicated name in the file.")}
+            if errors:
+                self.add_error(number, errors)
+                continue
+            valid[data["name"]] = (number, data)
+
+        if not valid:
+            return
+
+        # Una sola consulta de unicidad por lote
+        existing = dict(
+            Product.objects.filter(name__in=valid).values_list("name", "pk")
+        )
+        if self.mode == "create":
+            for name in existing:
+                number, data = valid.pop(name)
+                self.add_error(
+                    number, {"name": _("A product with this name already exists.")}
+                )
+            existing = {}
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        # Un bulk_update por combinación de columnas presentes
+        updates = {}
+        target_stock = {}
+        for name, (number, data) in valid.items():
+            if name in existing:
+                pk = existing[name]
+                if "stock" in data:
+                    target_stock[pk] = data.pop("stock")
+                fields = tuple(
+                    field
+                    for field in UPDATE_FIELDS
+                    if Product._meta.get_field(field).attname in data
+                )
+                product = Product(
+                    pk=pk, updated_by=self.user_name, updated_date=now, **data
+                )
+                updates.setdefault(fields, []).append(product)
+                to_update.append(product)
+                continue
+
+            missing = [
+                column
+                for column, field in REQUIRED_ON_CREATE.items()
+                if field not in data
+            ]
+            if missing:
+                self.add_error(
+                    number, {column: _("This field is required.") for column in missing}
+                )
+                continue
+            to_create.append(
+                Product(created_by=self.user_name, **{**CREATE_DEFAULTS, **data})
+            )
+
+        with transaction.atomic():
+            created = Product.objects.bulk_create(to_create)
+            for fields, products in updates.items():
+                Product.objects.bulk_update(
+                    products, [*fields, "updated_by", "updated_date"]
+                )
+            if target_stock:
+                self.set_stock(target_stock)
+            refresh_search_vector(
+                Product.objects.filter(
+                    pk__in=[product.pk for product in created + to_update]
+                )
+            )
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
+
+    def set_stock(self, target_stock):
+        # El stock del fichero es absoluto: se ajusta la diferencia en el libro
+        inventory.lock_products(target_stock)
+        balances = inventory.current_balances(target_stock)
+        inventory.record(
+            [
+                (pk, "adjustment", stock - balances[pk], "import", self.user_name)
+                for pk, stock in target_stock.items()
+            ]
+        )
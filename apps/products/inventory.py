@@ -0,0 +1,173 @@
+"""
+Inventory ledger.
+
+Sales, restocks and adjustments are inserted as ``InventoryMovement`` rows
+instead of rewriting ``Product.stock``. Writers serialize per product on a
+transaction-level advisory lock, so the balance they read under the lock is
+exact; ``compact`` periodically folds the pending deltas into
+``Product.stock``. Display and pre-checks read ``cached_balances``.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from apps.products.cache import catalog_cache
+from apps.products.models.inventory import InventoryMovement
+from apps.products.models.product import Product
+
+# Primer entero de pg_advisory_xact_lock(int, int), reservado al inventario
+LOCK_NAMESPACE = 1701
+CACHE_KEY = "inventory:balance:{}"
+
+
+def lock_products(product_ids):
+    """
+    Serializa a los escritores del inventario de estos productos hasta el fin
+    de la transacción. Siempre en orden de id para evitar interbloqueos.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    if connection.vendor != "postgresql":
+        products = Product.objects.select_for_update().filter(pk__in=product_ids)
+        list(products.order_by("pk").values_list("pk", flat=True))
+        return
+    with connection.cursor() as cursor:
+        for product_id in product_ids:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)", [LOCK_NAMESPACE, product_id]
+            )
+
+
+def current_balances(product_ids):
+    """Saldo exacto {product_id: stock disponible} leído de la base de datos."""
+    product_ids = set(product_ids)
+    balances = dict(
+        Product.objects.filter(pk__in=product_ids).values_list("pk", "stock")
+    )
+    pending = (
+        InventoryMovement.objects.filter(product_id__in=product_ids, compacted=False)
+        .values("product_id")
+        .annotate(total=Sum("delta"))
+    )
+    for row in pending:
+        balances[row["product_id"]] += row["total"]
+    return balances
+
+
+def cached_balances(product_ids):
+    """
+    Saldo desde la caché, para mostrar y validar antes de comprar. La venta
+    vuelve a comprobar con ``current_balances`` bajo el bloqueo.
+    """
+    keys = {
+        CACHE_KEY.format(product_id): product_id for product_id in set(product_ids)
+    }
+    cached = cache.get_many(keys)
+    balances = {keys[key]: value for key, value in cached.items()}
+    missing = [product_id for key, product_id in keys.items() if key not in cached]
+    if missing:
+        fresh = current_balances(missing)
+        cache.set_many(
+            {CACHE_KEY.format(pk): value for pk, value in fresh.items()},
+            settings.INVENTORY_BALANCE_TTL,
+        )
+        balances.update(fresh)
+    return balances
+
+
+def invalidate(product_ids):
+    keys = [CACHE_KEY.format(product_id) for product_id in set(product_ids)]
+    # Tras el commit, para que nadie vuelva a cachear el saldo anterior
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def record(movements, balances=None):
+    """
+    Inserta movimientos ``(product_id, kind, delta, reference, created_by)``.
+
+    Debe llamarse dentro de una transacción tras ``lock_products``. Si se pasan
+    los ``balances`` leídos bajo el bloqueo, los productos que quedan a cero se
+    marcan como inactivos, igual que hacía la venta sobre ``Product.stock``.
+    """
+    rows = [
+        InventoryMovement(
+            product_id=product_id,
+            kind=kind,
+            delta=delta,
+            reference=reference,
+            created_by=created_by,
+        )
+        for product_id, kind, delta, reference, created_by in movements
+        if delta
+    ]
+    InventoryMovement.objects.bulk_create(rows)
+
+    if balances is not None:
+        remaining = dict(balances)
+        for row in rows:
+            if row.product_id in remaining:
+                remaining[row.product_id] += row.delta
+        sold_out = [
+            row.product_id
+            for row in rows
+            if row.kind == "sale" and remaining.get(row.product_id, 1) <= 0
+        ]
+        if sold_out:
+            Product.objects.filter(pk__in=sold_out).update(is_active=False)
+            # update() no dispara señales: las respuestas cacheadas del catálogo
+            # seguirían mostrando el producto como activo
+            transaction.on_commit(catalog_cache.bump_version)
+
+    invalidate(row.product_id for row in rows)
+    return rows
+
+
+def adjust(product, delta, kind="adjustment", reference="", created_by=""):
+    """Registra una entrada o salida manual de stock."""
+    with transaction.atomic():
+        lock_products([product.pk])
+        record([(product.pk, kind, delta, reference, created_by)])
+
+
+def set_balance(product, target, reference="", created_by=""):
+    """
+    Lleva el saldo disponible a ``target`` registrando la diferencia como
+    ajuste; el saldo se lee bajo el bloqueo. Devuelve el delta aplicado.
+    """
+    with transaction.atomic():
+        lock_products([product.pk])
+        delta = target - current_balances([product.pk])[product.pk]
+        record([(product.pk, "adjustment", delta, reference, created_by)])
+    return delta
+
+
+def compact(product_ids):
+    """
+    Suma los movimientos pendientes en ``Product.stock`` y los marca como
+    compactados. El saldo disponible no cambia. Devuelve los movimientos
+    plegados.
+    """
+    with transaction.atomic():
+        lock_products(product_ids)
+        pending = InventoryMovement.objects.filter(
+            product_id__in=product_ids, compacted=False
+        )
+        totals = dict(
+            pending.values("product_id")
+            .annotate(total=Sum("delta"))
+            .values_list("product_id", "total")
+        )
+        if not totals:
+            return 0
+        stock = dict(Product.objects.filter(pk__in=totals).values_list("pk", "stock"))
+        products = [
+            Product(pk=product_id, stock=stock[product_id] + total)
+            for product_id, total in totals.items()
+        ]
+        # Solo la columna stock: ni auditoría ni señales
+        Product.objects.bulk_update(products, ["stock"])
+        folded = pending.update(compacted=True)
+    return folded
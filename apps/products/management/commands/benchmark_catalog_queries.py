@@ -0,0 +1,155 @@
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.products.filters.product import ProductFilter
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+
+# Índices compuestos cuyo efecto se mide (ver Product.Meta.indexes)
+INDEXES = [
+    "product_category_price_idx",
+    "product_category_created_idx",
+    "product_status_created_idx",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide con EXPLAIN ANALYZE las consultas del listado de productos con y "
+        "sin los índices compuestos. Todo ocurre en una transacción que se "
+        "revierte: los datos sembrados y los DROP INDEX no se conservan, pero "
+        "la tabla queda bloqueada mientras dura. No usar en producción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Productos de prueba a sembrar"
+        )
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--output", help="Archivo JSON con planes y tiempos")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("El benchmark requiere PostgreSQL")
+
+        with transaction.atomic():
+            if options["seed"]:
+                self.seed(options["seed"], options["categories"])
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Product._meta.db_table}")
+
+            shapes = self.shapes()
+            results = {"after": self.measure(shapes, options)}
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name in INDEXES:
+                        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                results["before"] = self.measure(shapes, options)
+                transaction.set_rollback(True)
+            transaction.set_rollback(True)
+
+        for label, params in shapes:
+            before, after = results["before"][label], results["after"][label]
+            self.stdout.write(
+                f"{label}: {before['median_ms']:.2f} ms -> "
+                f"{after['median_ms']:.2f} ms ({', '.join(after['indexes']) or '-'})"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump({"shapes": dict(shapes), **results}, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados en {options['output']}"))
+
+    def seed(self, count, categories):
+        tag = f"bench-{int(time.time())}"
+        category_ids = [
+            category.pk
+            for category in Category.objects.bulk_create(
+                Category(name=f"{tag}-{number}", created_by=tag)
+                for number in range(categories)
+            )
+        ]
+        statuses = ["active"] * 8 + ["inactive", "out of stock"]
+        batch = []
+        for number in range(count):
+            batch.append(
+                Product(
+                    name=f"{tag}-{number}",
+                    price=Decimal(random.randint(100, 100000)) / 100,
+                    status=random.choice(statuses),
+                    category_id=random.choice(category_ids),
+                    stock=random.randint(0, 500),
+                    is_active=random.random() < 0.9,
+                    created_by=tag,
+                )
+            )
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+
+        # auto_now_add pone la misma fecha a todo el lote; se reparte en un año
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Product._meta.db_table} "
+                "SET created_date = now() - random() * interval '365 days' "
+                "WHERE created_by = %s",
+                [tag],
+            )
+
+    def shapes(self):
+        """Filtros que emite el listado, con valores tomados de los datos."""
+        category = (
+            Product.objects.filter(is_active=True)
+            .values_list("category_id", flat=True)
+            .order_by("category_id")
+            .first()
+        )
+        if category is None:
+            raise CommandError("No hay productos activos; usar --seed")
+        return [
+            ("list", {}),
+            ("category", {"category": str(category)}),
+            (
+                "category_price",
+                {"category": str(category), "min_price": "10", "max_price": "50"},
+            ),
+            ("price", {"min_price": "10", "max_price": "50"}),
+            ("status", {"status": "out of stock"}),
+        ]
+
+    def measure(self, shapes, options):
+        results = {}
+        for label, params in shapes:
+            # Mismo queryset y orden que ProductViewSet con KeysetPagination
+            queryset = ProductFilter(
+                params, queryset=Product.objects.filter(is_active=True)
+            ).qs.order_by("-created_date", "-id")[: options["page_size"] + 1]
+
+            timings = []
+            for attempt in range(options["repeat"]):
+                start = time.perf_counter()
+                [*queryset.all()]
+                timings.append((time.perf_counter() - start) * 1000)
+
+            explain = queryset.explain(analyze=True, buffers=True, format="json")
+            plan = json.loads(explain)
+            results[label] = {
+                "median_ms": statistics.median(timings),
+                "indexes": sorted(self.plan_indexes(plan["Plan"])),
+                "plan": plan,
+            }
+        return results
+
+    def plan_indexes(self, node):
+        names = {node["Index Name"]} if "Index Name" in node else set()
+        for child in node.get("Plans", []):
+            names |= self.plan_indexes(child)
+        return names
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.products import inventory
+from apps.products.models.inventory import InventoryMovement
+
+
+class Command(BaseCommand):
+    help = (
+        "Suma los movimientos de inventario pendientes en Product.stock, por "
+        "lotes de productos. Pensado para ejecutarse periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        product_ids = list(
+            InventoryMovement.objects.filter(compacted=False)
+            .values_list("product_id", flat=True)
+            .distinct()
+            .order_by("product_id")
+        )
+
+        folded = 0
+        for start in range(0, len(product_ids), batch_size):
+            # Cada lote en su transacción: bloqueos cortos sobre pocos productos
+            folded += inventory.compact(product_ids[start : start + batch_size])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{folded} movimientos compactados en {len(product_ids)} productos"
+            )
+        )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.products.models.category import Category
+from apps.products.models.inventory import InventoryMovement
+from apps.products.models.product import Product
+
+MODELS = [Category, Product, InventoryMovement]
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea con CREATE INDEX CONCURRENTLY los índices declarados en los modelos "
+        "del catálogo que falten en la base de datos, sin bloquear escrituras."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Solo lista los índices que faltan"
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("CREATE INDEX CONCURRENTLY requiere PostgreSQL")
+
+        created = 0
+        for model in MODELS:
+            existing = self.existing_indexes(connection, model._meta.db_table)
+            for index in model._meta.indexes:
+                valid = existing.get(index.name)
+                if valid:
+                    continue
+                if options["dry_run"]:
+                    self.stdout.write(f"{model._meta.db_table}.{index.name}")
+                    continue
+
+                # CONCURRENTLY no admite transacción: atomic=False
+                with connection.schema_editor(atomic=False) as editor:
+                    if valid is False:
+                        # Restos de una creación concurrente interrumpida
+                        editor.remove_index(model, index, concurrently=True)
+                    editor.add_index(model, index, concurrently=True)
+                self.stdout.write(f"{model._meta.db_table}.{index.name} creado")
+                created += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{created} índices creados"))
+
+    def existing_indexes(self, connection, table):
+        """{nombre: es_válido} de los índices de la tabla."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname, i.indisvalid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE i.indrelid = %s::regclass
+                """,
+                [connection.ops.quote_name(table)],
+            )
+            return dict(cursor.fetchall())
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from apps.products import images
+from apps.products.models.product import Product
+
+
+class Command(BaseCommand):
+    help = "Genera las variantes de las imágenes de producto existentes en paralelo"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Por defecto, todos los núcleos"
+        )
+        parser.add_argument(
+            "--force", action="store_true", help="Regenerar aunque ya existan"
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"] or os.cpu_count() or 1
+        storage = Product._meta.get_field("image").storage
+        names = (
+            Product.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("image", flat=True)
+            .distinct()
+            .iterator()
+        )
+
+        generated = 0
+        failed = 0
+        pending = {}
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            for name in names:
+                if not options["force"] and images.has_variants(storage, name):
+                    continue
+                try:
+                    args = images.render_args(storage, name)
+                except OSError as exc:
+                    self.stderr.write(f"{name}: {exc}")
+                    failed += 1
+                    continue
+                pending[executor.submit(images.render_variants, *args)] = name
+
+                # Pocas imágenes en vuelo: la memoria no crece con el catálogo
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    generated, failed = self.collect(
+                        storage, pending, done, generated, failed
+                    )
+
+            generated, failed = self.collect(
+                storage, pending, list(pending), generated, failed
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{generated} imágenes procesadas, {failed} con errores"
+            )
+        )
+
+    def collect(self, storage, pending, done, generated, failed):
+        for future in done:
+            name = pending.pop(future)
+            try:
+                images.save_variants(storage, name, future.result())
+                generated += 1
+            except Exception as exc:
+                self.stderr.write(f"{name}: {exc}")
+                failed += 1
+        return generated, failed
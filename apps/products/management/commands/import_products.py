@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products.importer import (
+    FORMATS,
+    MODES,
+    ProductImporter,
+    detect_format,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Importa productos desde un fichero CSV o JSONL, por lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--mode", choices=MODES, default="upsert")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--user", default="import", help="Valor de created_by")
+        parser.add_argument(
+            "--errors", help="Fichero JSONL donde escribir los errores por fila"
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser mayor que cero")
+        file_format = options["format"] or detect_format(options["path"])
+
+        importer = ProductImporter(
+            batch_size=options["batch_size"],
+            mode=options["mode"],
+            user_name=options["user"],
+            # Sin --errors solo se guardan los primeros para la salida
+            max_errors=None if options["errors"] else 20,
+        )
+        try:
+            stream = open(options["path"], "rb")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        with stream:
+            report = importer.run(read_rows(stream, file_format))
+
+        if options["errors"]:
+            with open(options["errors"], "w", encoding="utf-8") as out:
+                for error in report["errors"]:
+                    out.write(json.dumps(error, ensure_ascii=False) + "\n")
+        else:
+            for error in report["errors"]:
+                self.stderr.write(json.dumps(error, ensure_ascii=False))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['created']} creados, {report['updated']} actualizados, "
+                f"{report['error_count']} filas con errores"
+            )
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from apps.products.models.product import Product
+from apps.products.search import refresh_search_vector
+
+
+class Command(BaseCommand):
+    help = "Recalcula el vector de búsqueda de los productos por lotes de ids"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        bounds = Product.objects.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            self.stdout.write("No hay productos")
+            return
+
+        updated = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            updated += refresh_search_vector(
+                Product.objects.filter(id__gte=start, id__lt=start + batch_size)
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} productos actualizados"))
@@ -1,2 +1,3 @@
 from apps.products.models.category import Category
 from apps.products.models.product import Product
+from apps.products.models.inventory import InventoryMovement
@@ -0,0 +1,54 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from apps.products.models.product import Product
+
+MOVEMENT_KIND_CHOICES = [
+    ("sale", _("Sale")),
+    ("restock", _("Restock")),
+    ("adjustment", _("Adjustment")),
+    ("hold", _("Cart hold")),
+    ("release", _("Hold release")),
+]
+
+
+class InventoryMovement(models.Model):
+    """
+    Append-only stock ledger. The available stock of a product is
+    ``Product.stock`` plus the deltas not yet compacted into it.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="movements",
+        verbose_name=_("Product"),
+    )
+    kind = models.CharField(
+        verbose_name=_("Kind"), max_length=20, choices=MOVEMENT_KIND_CHOICES
+    )
+    # Negativo para ventas y salidas
+    delta = models.IntegerField(verbose_name=_("Delta"))
+    reference = models.CharField(
+        verbose_name=_("Reference"), max_length=100, blank=True, default=""
+    )
+    created_by = models.CharField(
+        verbose_name=_("Created by"), max_length=255, blank=True, default=""
+    )
+    created_at = models.DateTimeField(verbose_name=_("Created at"), auto_now_add=True)
+    # True cuando el delta ya está sumado en Product.stock
+    compacted = models.BooleanField(verbose_name=_("Compacted"), default=False)
+
+    class Meta:
+        verbose_name = _("Inventory movement")
+        verbose_name_plural = _("Inventory movements")
+        indexes = [
+            # Saldo pendiente por producto: solo las filas sin compactar
+            models.Index(
+                fields=["product"],
+                name="inventory_pending_idx",
+                condition=models.Q(compacted=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.kind} {self.delta:+d}"
@@ -1,7 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 from apps.common.models import AuditableMixins
 from apps.products.models.category import Category
+from apps.products.storage import ContentHashStorage
 
 STATUS_CHOICES = [
     ("active", _("Active")),
@@ -37,14 +41,65 @@ class Product(AuditableMixins, models.Model):
     stock = models.IntegerField(
         verbose_name=_("Stock"), blank=False, null=False, default=0
     )
+    # Archivos nombrados por contenido: la misma imagen se guarda una sola vez
     image = models.ImageField(
-        upload_to="products", verbose_name=_("image"), blank=True, null=True
+        upload_to="products",
+        storage=ContentHashStorage(),
+        verbose_name=_("image"),
+        blank=True,
+        null=True,
     )
     is_active = models.BooleanField(verbose_name=_(("is active")), default=True)
+    # Activa el control de admisión de apps.payment.admission en la compra
+    flash_sale = models.BooleanField(verbose_name=_("Flash sale"), default=False)
+    # Mantenido por apps.products.signals; ver apps.products.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = _("Product")
         verbose_name_plural = _("Products")
+        indexes = [
+            # Orden de la paginación por cursor del listado
+            models.Index(
+                fields=["-created_date", "-id"],
+                name="product_active_created_idx",
+                condition=models.Q(is_active=True),
+            ),
+            # Combinaciones de ProductFilter sobre el listado activo; se crean
+            # sin bloquear escrituras con el comando create_catalog_indexes
+            models.Index(
+                fields=["category", "price"],
+                name="product_category_price_idx",
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=["category", "-created_date", "-id"],
+                name="product_category_created_idx",
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=["status", "-created_date", "-id"],
+                name="product_status_created_idx",
+                condition=models.Q(is_active=True),
+            ),
+            # Búsqueda de productos por nombre sin distinguir mayúsculas
+            models.Index(Lower("name"), name="product_name_lower_idx"),
+            GinIndex(fields=["search_vector"], name="product_search_vector_idx"),
+            GinIndex(
+                fields=["name"], name="product_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ]
 
     def __str__(self):
         return f" Product {self.name} priced at {self.price}"
+
+    def save(self, *args, **kwargs):
+        # stock solo lo escribe apps.products.inventory.compact bajo bloqueo: un
+        # save completo con un valor leído antes desharía la compactación
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "stock"
+            ]
+        super().save(*args, **kwargs)
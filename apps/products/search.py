@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def get_search_config():
+    return getattr(settings, "PRODUCT_SEARCH_CONFIG", "simple")
+
+
+def build_search_vector():
+    """Vector ponderado: el nombre pesa más que la descripción."""
+    config = get_search_config()
+    return SearchVector("name", weight="A", config=config) + SearchVector(
+        "description", weight="B", config=config
+    )
+
+
+def refresh_search_vector(queryset):
+    """Recalcula ``search_vector`` en una sola sentencia UPDATE."""
+    if connection.vendor != "postgresql":
+        return 0
+    return queryset.update(search_vector=build_search_vector())
+
+
+def search_products(queryset, term):
+    """
+    Filter ``queryset`` by full-text match or trigram similarity on the name
+    and annotate it with ``search_rank`` (higher is better).
+    """
+    query = SearchQuery(term, config=get_search_config(), search_type="websearch")
+    return queryset.annotate(
+        # search_vector es NULL hasta update_search_vectors; un rango NULL
+        # rompería el cursor de la paginación. ts_rank y similarity son
+        # float4: en double precision el valor del cursor vuelve exacto por
+        # JSON y la igualdad del seek no falla
+        search_rank=Cast(
+            Coalesce(
+                SearchRank(F("search_vector"), query),
+                Value(0.0),
+                output_field=FloatField(),
+            )
+            + TrigramSimilarity("name", term),
+            FloatField(),
+        )
+    ).filter(Q(search_vector=query) | Q(name__trigram_similar=term))
@@ -1,10 +1,40 @@
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from apps.common.serializer import AuditableSerializerMixin
+from apps.products import inventory
+from apps.products.images import variant_urls
 from apps.products.models.product import STATUS_CHOICES, Product
+from apps.products.validators import validate_image
 
 
-class ProductListSerializer(AuditableSerializerMixin):
+class ImageVariantsMixin(serializers.Serializer):
+    # {variante: {formato: url}}; las listas deberían usar "thumb"
+    image_variants = serializers.SerializerMethodField()
+
+    def get_image_variants(self, obj):
+        return variant_urls(obj.image)
+
+
+class AvailableStockMixin(serializers.Serializer):
+    # Saldo del libro de inventario; Product.stock es solo la base compactada
+    stock = serializers.SerializerMethodField()
+
+    def get_stock(self, obj):
+        balances = self.context.setdefault("stock_balances", {})
+        if obj.pk not in balances:
+            # En un listado, un solo acceso a la caché para toda la página
+            instances = [obj]
+            if isinstance(self.parent, serializers.ListSerializer):
+                instances = self.parent.instance or instances
+            balances.update(
+                inventory.cached_balances(instance.pk for instance in instances)
+            )
+        return balances.get(obj.pk, obj.stock)
+
+
+class ProductListSerializer(
+    ImageVariantsMixin, AvailableStockMixin, AuditableSerializerMixin
+):
     class Meta:
         model = Product
         fields = [
@@ -14,14 +44,18 @@ class ProductListSerializer(AuditableSerializerMixin):
             "stock",
             "price",
             "image",
+            "image_variants",
             "status",
         ]
 
 
-class ProductRetrieveSerializer(AuditableSerializerMixin):
+class ProductRetrieveSerializer(
+    ImageVariantsMixin, AvailableStockMixin, AuditableSerializerMixin
+):
     class Meta:
         model = Product
-        fields = "__all__"
+        # El tsvector es interno de la búsqueda
+        exclude = ["search_vector"]
 
 
 class ProductCreateSerializer(AuditableSerializerMixin):
@@ -64,12 +98,7 @@ class ProductCreateSerializer(AuditableSerializerMixin):
 
     def validate_image(self, value):
         if value:
-            filesize = value.size
-            megabyte_limit = 5.0
-            if filesize > megabyte_limit * 1024 * 1024:
-                raise serializers.ValidationError(
-                    _("Max file size is %sMB" % str(megabyte_limit))
-                )
+            validate_image(value)
         return value
 
     def validate_status(self, value):
@@ -98,6 +127,9 @@ class ProductCreateSerializer(AuditableSerializerMixin):
 
 
 class ProductUpdateSerializer(AuditableSerializerMixin):
+    # Saldo disponible deseado; se aplica como ajuste en el libro de inventario
+    stock = serializers.IntegerField(required=False)
+
     class Meta:
         model = Product
         fields = [
@@ -155,12 +187,7 @@ class ProductUpdateSerializer(AuditableSerializerMixin):
 
     def validate_image(self, value):
         if value:
-            filesize = value.size
-            megabyte_limit = 5.0
-            if filesize > megabyte_limit * 1024 * 1024:
-                raise serializers.ValidationError(
-                    _("Max file size is %sMB" % str(megabyte_limit))
-                )
+            validate_image(value)
         return value
 
     def validate_status(self, value):
@@ -190,3 +217,18 @@ class ProductUpdateSerializer(AuditableSerializerMixin):
             )
 
         return data
+
+    def update(self, instance, validated_data):
+        target = validated_data.pop("stock", None)
+        instance = super().update(instance, validated_data)
+        if target is not None:
+            inventory.set_balance(
+                instance, target, "api", validated_data.get("updated_by") or ""
+            )
+        return instance
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "stock" in data:
+            data["stock"] = inventory.current_balances([instance.pk])[instance.pk]
+        return data
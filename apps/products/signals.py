@@ -0,0 +1,62 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.products import images, inventory
+from apps.products.cache import catalog_cache
+from apps.products.models.category import Category
+from apps.products.models.product import Product
+from apps.products.search import refresh_search_vector
+
+SEARCHABLE_FIELDS = {"name", "description"}
+
+
+def create_search_extensions(sender, using, **kwargs):
+    # Los índices trigram necesitan pg_trgm antes de crear las tablas
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+@receiver(post_save, sender=Product)
+def update_product_search_vector(sender, instance, update_fields=None, **kwargs):
+    if kwargs.get("raw"):
+        return
+    if update_fields is not None and not SEARCHABLE_FIELDS & set(update_fields):
+        return
+    refresh_search_vector(Product.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    if kwargs.get("raw"):
+        return
+    # Tras el commit: antes, otro lector cachearía las filas anteriores bajo
+    # la versión nueva
+    transaction.on_commit(catalog_cache.bump_version)
+
+
+@receiver(post_save, sender=Product)
+def invalidate_inventory_balance(sender, instance, update_fields=None, **kwargs):
+    # Un cambio directo de stock (admin, API) altera el saldo disponible
+    if update_fields is not None and "stock" not in update_fields:
+        return
+    inventory.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+def generate_image_variants(sender, instance, update_fields=None, **kwargs):
+    if kwargs.get("raw") or not instance.image:
+        return
+    if update_fields is not None and "image" not in update_fields:
+        return
+    image = instance.image
+    if images.has_variants(image.storage, image.name):
+        return
+    # Tras el commit, para no procesar imágenes de una transacción revertida
+    transaction.on_commit(lambda: images.schedule_variants(image))
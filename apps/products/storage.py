@@ -0,0 +1,69 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentHashStorage(FileSystemStorage):
+    """
+    Guarda cada archivo con el nombre ``<upload_to>/<sha256><ext>``.
+
+    La subida se copia por bloques a un temporal mientras se calcula el hash;
+    si ya existe un archivo con ese contenido se reutiliza y el temporal se
+    descarta, de modo que la misma imagen subida para varios productos ocupa
+    disco una sola vez.
+    """
+
+    chunk_size = 64 * 1024
+
+    def _save(self, name, content):
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        # En el mismo directorio, para que el renombrado final sea atómico
+        fd, temp_path = tempfile.mkstemp(dir=full_directory, suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    temp.write(chunk)
+
+            name = os.path.join(directory, f"{digest.hexdigest()}{extension}")
+            full_path = self.path(name)
+            if not os.path.exists(full_path):
+                # Dos subidas simultáneas del mismo contenido escriben lo mismo
+                os.replace(temp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return name.replace("\\", "/")
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre definitivo lo decide el hash en _save
+        return name
+
+    def save_as(self, name, content):
+        """Guarda con el nombre exacto (archivos derivados, como las variantes)."""
+        full_path = self.path(name)
+        full_directory = os.path.dirname(full_path)
+        os.makedirs(full_directory, exist_ok=True)
+        # Como en _save: nadie debe leer un archivo a medio escribir
+        fd, temp_path = tempfile.mkstemp(dir=full_directory, suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                for chunk in content.chunks(self.chunk_size):
+                    temp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
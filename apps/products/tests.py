@@ -1,3 +1,503 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import tempfile
+import threading
+from unittest import skipIf, skipUnless
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.products import facets, images, inventory
+from apps.products.cache import catalog_cache
+from apps.manager.models import User
+from apps.products.models import Category, InventoryMovement, Product
+
+
+def create_product(stock=10, **kwargs):
+    category = Category.objects.create(name="Category")
+    return Product.objects.create(
+        name="Product", price=10, category=category, stock=stock, **kwargs
+    )
+
+
+def api_client(email="user@example.com", **kwargs):
+    user = User.objects.create_user(
+        email=email, password="secret", first_name="User", **kwargs
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def cursor(values, reverse=0):
+    payload = json.dumps({"v": values, "r": reverse}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def png(color="red", size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def sell(product, quantity, reference="order"):
+    # Igual que la compra: bloqueo, saldo exacto y venta en el libro
+    with transaction.atomic():
+        inventory.lock_products([product.pk])
+        balances = inventory.current_balances([product.pk])
+        quantity = min(quantity, balances[product.pk])
+        inventory.record(
+            [(product.pk, "sale", -quantity, reference, "test")], balances
+        )
+    return quantity
+
+
+class ProductPaginationTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+        self.client = api_client()
+        category = Category.objects.create(name="Category")
+        for number in range(5):
+            Product.objects.create(
+                name=f"Product {number}", price=10, category=category, stock=1
+            )
+
+    def test_pages_cover_every_product_once(self):
+        names = []
+        url = "/products/products/?page_size=2"
+        while url:
+            response = self.client.get(url)
+            names += [product["name"] for product in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(sorted(names), [f"Product {number}" for number in range(5)])
+
+        previous = self.client.get(response.data["previous"])
+        self.assertEqual(len(previous.data["results"]), 2)
+
+    def test_malformed_cursor_is_not_found(self):
+        for values in (["not a date", 1], ["2024-01-01T00:00:00+00:00", "x"], [1]):
+            response = self.client.get(f"/products/products/?cursor={cursor(values)}")
+            self.assertEqual(response.status_code, 404)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+        self.client = api_client()
+        self.category = Category.objects.create(name="Category")
+
+    def create(self, name, description=""):
+        return Product.objects.create(
+            name=name,
+            description=description,
+            price=10,
+            category=self.category,
+            stock=1,
+        )
+
+    def test_retrieve_hides_search_vector(self):
+        product = self.create("Phone")
+        response = self.client.get(f"/products/products/{product.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("search_vector", response.data)
+
+    @skipUnless(connection.vendor == "postgresql", "Búsqueda de PostgreSQL")
+    def test_name_matches_rank_first_and_typos_match(self):
+        self.create("Case", "Protective case for any phone")
+        self.create("Phone", "Smart phone")
+        self.create("Lamp")
+
+        response = self.client.get("/products/products/?search=phone")
+        names = [product["name"] for product in response.data["results"]]
+        self.assertEqual(names, ["Phone", "Case"])
+
+        response = self.client.get("/products/products/?search=phon")
+        names = [product["name"] for product in response.data["results"]]
+        self.assertIn("Phone", names)
+
+    @skipUnless(connection.vendor == "postgresql", "Búsqueda de PostgreSQL")
+    def test_search_pages_follow_the_rank(self):
+        for number in range(5):
+            self.create(f"Phone {number}", "phone " * number)
+
+        names = []
+        url = "/products/products/?search=phone&page_size=2"
+        while url:
+            response = self.client.get(url)
+            names += [product["name"] for product in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(len(names), 5)
+        self.assertEqual(len(set(names)), 5)
+
+
+class CatalogCacheInvalidationTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+
+    def test_list_is_served_from_cache_until_a_product_changes(self):
+        client = api_client()
+        product = create_product()
+
+        self.assertEqual(client.get("/products/products/")["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = client.get("/products/products/")
+        self.assertEqual(response["X-Cache"], "HIT")
+        # Otros parámetros, otra entrada
+        response = client.get("/products/products/?page_size=5")
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = "Renamed"
+            product.save()
+        response = client.get("/products/products/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["name"], "Renamed")
+
+    def test_version_is_bumped_after_commit(self):
+        version = catalog_cache.get_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            product = create_product()
+            product.name = "Renamed"
+            product.save()
+            self.assertEqual(catalog_cache.get_version(), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(catalog_cache.get_version(), version)
+
+
+class ImageStorageTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def files(self):
+        return sorted(os.listdir(os.path.join(self.media_root, "products")))
+
+    def test_same_content_is_stored_once(self):
+        first = create_product()
+        first.image.save("first.png", ContentFile(png()))
+        second = create_product()
+        second.image.save("second.png", ContentFile(png()))
+        other = create_product()
+        other.image.save("first.png", ContentFile(png(color="blue")))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        names = [first.image.name, other.image.name]
+        self.assertEqual(self.files(), sorted(map(os.path.basename, names)))
+
+    def test_variants_are_served_once_written(self):
+        product = create_product()
+        product.image.save("photo.png", ContentFile(png(size=(800, 400))))
+        image = product.image
+
+        urls = images.variant_urls(image)
+        self.assertEqual({urls["thumb"]["webp"], urls["medium"]["jpeg"]}, {image.url})
+
+        args = images.render_args(image.storage, image.name)
+        images.save_variants(image.storage, image.name, images.render_variants(*args))
+
+        self.assertTrue(images.has_variants(image.storage, image.name))
+        urls = images.variant_urls(image)
+        self.assertTrue(urls["thumb"]["webp"].endswith("_thumb.webp"))
+        with Image.open(image.storage.path(image.name[:-4] + "_thumb.jpg")) as thumb:
+            self.assertEqual(thumb.size, (200, 100))
+        # Sin temporales a medio escribir
+        self.assertFalse([name for name in self.files() if name.endswith(".upload")])
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+        self.category = Category.objects.create(name="Phones")
+
+    def test_bad_rows_are_reported_and_the_rest_imported(self):
+        existing = Product.objects.create(
+            name="Old phone", price=10, category=self.category, stock=5
+        )
+        feed = (
+            "name,category,price,stock\n"
+            "New phone,phones,99.90,3\n"
+            "Old phone,Phones,12,8\n"
+            "No,phones,1,1\n"
+            "Bad price,phones,-1,1\n"
+            "Lost,Tablets,5,1\n"
+            "New phone,phones,99.90,3\n"
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = os.path.join(directory.name, "feed.csv")
+        errors_path = os.path.join(directory.name, "errors.jsonl")
+        with open(source, "w", encoding="utf-8") as out:
+            out.write(feed)
+
+        out = io.StringIO()
+        call_command("import_products", source, "--errors", errors_path, stdout=out)
+
+        self.assertIn("1 creados, 1 actualizados, 4 filas con errores", out.getvalue())
+        with open(errors_path, encoding="utf-8") as report:
+            errors = [json.loads(line) for line in report]
+        self.assertEqual(
+            [(error["row"], [*error["errors"]]) for error in errors],
+            [(3, ["name"]), (4, ["price"]), (5, ["category"]), (6, ["name"])],
+        )
+        existing.refresh_from_db()
+        self.assertEqual(existing.price, 12)
+        # El stock del fichero se fija con un ajuste en el libro
+        self.assertEqual(inventory.current_balances([existing.pk])[existing.pk], 8)
+        self.assertTrue(Product.objects.filter(name="New phone").exists())
+
+    def test_endpoint_returns_the_report_to_admins(self):
+        feed = (
+            b'{"name": "Phone", "category": "phones", "price": "10"}\n'
+            b"not json\n"
+            b'{"name": "Case", "price": "5"}\n'
+        )
+        upload = ContentFile(feed, name="feed.jsonl")
+
+        response = api_client().post(
+            "/products/products/import/", {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 403)
+
+        upload.seek(0)
+        client = api_client(email="admin@example.com", is_staff=True)
+        response = client.post(
+            "/products/products/import/", {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["error_count"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3])
+        self.assertEqual(
+            response.data["errors"][1]["errors"],
+            {"category": "This field is required."},
+        )
+
+
+class ProductExportTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+        self.category = Category.objects.create(name="Category")
+
+    def export(self, query):
+        response = self.client.get(f"/products/products/export/?{query}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_ndjson_follows_the_list_filters_and_the_ledger(self):
+        cheap = Product.objects.create(
+            name="Cheap", price=5, category=self.category, stock=10
+        )
+        Product.objects.create(name="Dear", price=500, category=self.category, stock=1)
+        sell(cheap, 3)
+
+        rows = [json.loads(line) for line in self.export("max_price=100").splitlines()]
+        self.assertEqual([row["name"] for row in rows], ["Cheap"])
+        # Incluye las ventas aún sin compactar
+        self.assertEqual(rows[0]["available_stock"], 7)
+        self.assertEqual(rows[0]["category__name"], "Category")
+
+    def test_csv_has_a_header_and_one_line_per_product(self):
+        for number in range(3):
+            Product.objects.create(
+                name=f"Product, {number}", price=10, category=self.category, stock=1
+            )
+
+        lines = self.export("output=csv").splitlines()
+        self.assertEqual(lines[0].split(",")[:2], ["id", "name"])
+        self.assertEqual(len(lines), 4)
+        self.assertIn('"Product, 0"', lines[1])
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get("/products/products/export/?output=xml")
+        self.assertEqual(response.status_code, 400)
+
+
+class ProductFacetTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+        self.client = api_client()
+
+    def test_signature_ignores_order_empty_and_unknown_params(self):
+        first = QueryDict("status=active&min_price=10&page_size=5&name=")
+        second = QueryDict("min_price=10&status=active")
+        self.assertEqual(facets.signature(first), facets.signature(second))
+        self.assertEqual(
+            facets.signature(first), [("min_price", "10"), ("status", "active")]
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "GROUPING SETS de PostgreSQL")
+    def test_counts_follow_the_filters_and_the_cache_version(self):
+        phones = Category.objects.create(name="Phones")
+        cases = Category.objects.create(name="Cases")
+        for price in (5, 30, 30):
+            Product.objects.create(
+                name=f"Phone {price}", price=price, category=phones, stock=1
+            )
+        Product.objects.create(
+            name="Case", price=5, category=cases, stock=1, status="inactive"
+        )
+
+        response = self.client.get("/products/products/facets/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["total"], 4)
+        self.assertEqual(
+            [(facet["name"], facet["count"]) for facet in response.data["categories"]],
+            [("Phones", 3), ("Cases", 1)],
+        )
+        prices = {facet["min"]: facet["count"] for facet in response.data["prices"]}
+        self.assertEqual(prices, {0: 2, 25: 2})
+
+        response = self.client.get("/products/products/facets/?status=active")
+        self.assertEqual(response.data["total"], 3)
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/products/products/facets/")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="Phone 2", price=2, category=phones, stock=1)
+        response = self.client.get("/products/products/facets/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["total"], 5)
+
+
+class InventoryLedgerTests(TestCase):
+    def test_compaction_keeps_balance(self):
+        product = create_product(stock=10)
+        sell(product, 3)
+        inventory.adjust(product, 5)
+
+        self.assertEqual(inventory.compact([product.pk]), 2)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 12)
+        self.assertEqual(inventory.current_balances([product.pk])[product.pk], 12)
+        self.assertFalse(InventoryMovement.objects.filter(compacted=False).exists())
+
+    def test_stale_save_does_not_undo_compaction(self):
+        product = create_product(stock=10)
+        stale = Product.objects.get(pk=product.pk)
+        sell(product, 4)
+        inventory.compact([product.pk])
+
+        stale.name = "Renamed"
+        stale.save()
+        self.assertEqual(inventory.current_balances([product.pk])[product.pk], 6)
+
+    def test_set_balance_records_difference(self):
+        product = create_product(stock=10)
+        sell(product, 4)
+
+        self.assertEqual(inventory.set_balance(product, 20), 14)
+        self.assertEqual(inventory.current_balances([product.pk])[product.pk], 20)
+
+    def test_sold_out_product_is_deactivated(self):
+        product = create_product(stock=2)
+        version = catalog_cache.get_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sell(product, 5), 2)
+
+        product.refresh_from_db()
+        self.assertFalse(product.is_active)
+        self.assertEqual(inventory.cached_balances([product.pk])[product.pk], 0)
+        self.assertNotEqual(catalog_cache.get_version(), version)
+
+    def test_partial_sale_keeps_product_active(self):
+        product = create_product(stock=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            sell(product, 2)
+
+        product.refresh_from_db()
+        self.assertTrue(product.is_active)
+        self.assertEqual(inventory.cached_balances([product.pk])[product.pk], 3)
+
+
+class CatalogIndexTests(TransactionTestCase):
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command("create_catalog_indexes", *args, stdout=out)
+        return out.getvalue()
+
+    @skipIf(connection.vendor == "postgresql", "Solo fuera de PostgreSQL")
+    def test_command_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            self.run_command()
+
+    @skipUnless(connection.vendor == "postgresql", "CONCURRENTLY de PostgreSQL")
+    def test_missing_partial_index_is_rebuilt(self):
+        index = next(
+            index
+            for index in Product._meta.indexes
+            if index.name == "product_category_price_idx"
+        )
+        with connection.schema_editor() as editor:
+            editor.remove_index(Product, index)
+
+        self.assertIn("product_category_price_idx", self.run_command("--dry-run"))
+        self.assertIn("1 índices creados", self.run_command())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE indexname = %s",
+                ["product_category_price_idx"],
+            )
+            (definition,) = cursor.fetchone()
+        self.assertIn("WHERE is_active", definition)
+        self.assertNotIn("product_category_price_idx", self.run_command("--dry-run"))
+
+
+@skipUnless(connection.vendor == "postgresql", "Bloqueos consultivos de PostgreSQL")
+class ConcurrentCompactionTests(TransactionTestCase):
+    def run_threads(self, *targets):
+        errors = []
+
+        def run(target):
+            try:
+                target()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_sales_during_compaction_are_not_lost(self):
+        product = create_product(stock=100)
+        sold = []
+
+        def sales():
+            for number in range(40):
+                sold.append(sell(product, 1, f"order:{number}"))
+
+        def compaction():
+            for attempt in range(40):
+                inventory.compact([product.pk])
+
+        self.run_threads(sales, compaction)
+        inventory.compact([product.pk])
+
+        product.refresh_from_db()
+        self.assertEqual(sum(sold), 40)
+        self.assertEqual(product.stock, 60)
+        self.assertEqual(inventory.current_balances([product.pk])[product.pk], 60)
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from apps.products.views.cache import CatalogCacheStatsView
 from apps.products.views.category import CategoryProductViewSet
 from apps.products.views.product import ProductViewSet
 
@@ -13,5 +14,6 @@ router.register(r"products", ProductViewSet, basename="product")
 
 # Las URLs se generan automáticamente
 urlpatterns = [
+    path("cache-stats/", CatalogCacheStatsView.as_view(), name="catalog-cache-stats"),
     path("", include(router.urls)),
 ]
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from PIL import Image, UnidentifiedImageError
+
+
+def validate_image(image):
+    """Valida tamaño y dimensiones leyendo solo la cabecera de la imagen."""
+    megabyte_limit = settings.PRODUCT_IMAGE_MAX_SIZE_MB
+    if image.size > megabyte_limit * 1024 * 1024:
+        raise ValidationError(_("Max file size is %sMB") % megabyte_limit)
+
+    try:
+        # Image.open es perezoso: lee la cabecera y no decodifica el bitmap
+        with Image.open(image) as opened:
+            width, height = opened.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValidationError(_("Upload a valid image."))
+    finally:
+        image.seek(0)
+
+    max_dimension = settings.PRODUCT_IMAGE_MAX_DIMENSION
+    if width > max_dimension or height > max_dimension:
+        raise ValidationError(
+            _("Image dimensions must not exceed %(max)sx%(max)s pixels.")
+            % {"max": max_dimension}
+        )
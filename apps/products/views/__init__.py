@@ -1,2 +1,3 @@
 from apps.products.views.category import CategoryProductViewSet
 from apps.products.views.product import ProductViewSet
+from apps.products.views.cache import CatalogCacheStatsView
@@ -0,0 +1,34 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from drf_yasg import openapi as oa
+from drf_yasg.utils import swagger_auto_schema
+
+from apps.products.cache import catalog_cache
+
+
+class CatalogCacheStatsView(APIView):
+    """
+    Hit and miss counters of the catalog response cache
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description=_("Catalog response cache statistics"),
+        manual_parameters=[
+            oa.Parameter(
+                name="Authorization",
+                in_=oa.IN_HEADER,
+                description="Bearer <access_token>",
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+        ],
+        responses={200: oa.Response(description=_("Cache statistics"))},
+    )
+    def get(self, request):
+        return Response(catalog_cache.stats(), status=status.HTTP_200_OK)
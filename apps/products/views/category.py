@@ -18,10 +18,12 @@ from apps.products.filters.category import CategoryProductFilter
 from drf_yasg import openapi as oa
 from drf_yasg.utils import swagger_auto_schema
 
+from apps.common.cache import CachedResponseMixin
 from apps.common.views import BaseModelViewSet
+from apps.products.cache import catalog_cache
 
 
-class CategoryProductViewSet(BaseModelViewSet):
+class CategoryProductViewSet(CachedResponseMixin, BaseModelViewSet):
     """
     API endpoints for management of category products
     """
@@ -30,6 +32,7 @@ class CategoryProductViewSet(BaseModelViewSet):
     serializer_class = CategoryListSerializer
     filter_class = CategoryProductFilter
     permission_classes = [IsAuthenticated]
+    response_cache = catalog_cache
 
     def get_serializer_class(self):
         if self.action in ["list"]:
@@ -1,7 +1,9 @@
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
@@ -18,18 +20,38 @@ from apps.products.filters.product import ProductFilter
 from drf_yasg import openapi as oa
 from drf_yasg.utils import swagger_auto_schema
 
-from apps.common.views import BaseModelViewSet
+from apps.common.pagination import KeysetPagination
+from apps.common.cache import CachedResponseMixin
+from apps.common.views import BaseModelViewSet, get_user_fullname
+from apps.products import export, facets
+from apps.products.cache import catalog_cache
+from apps.products.importer import (
+    FORMATS,
+    MODES,
+    ProductImporter,
+    detect_format,
+    read_rows,
+)
+
+
+FACET = oa.Schema(
+    type=oa.TYPE_OBJECT,
+    properties={"count": oa.Schema(type=oa.TYPE_INTEGER)},
+    additional_properties=True,
+)
 
 
-class ProductViewSet(BaseModelViewSet):
+class ProductViewSet(CachedResponseMixin, BaseModelViewSet):
     """
     API endpoints for management of products
     """
 
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductListSerializer
-    filter_class = ProductFilter
+    filterset_class = ProductFilter
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
+    response_cache = catalog_cache
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -42,8 +64,20 @@ class ProductViewSet(BaseModelViewSet):
             return ProductUpdateSerializer
         return super().get_serializer_class()
 
+    def get_keyset_ordering(self):
+        # Con ?search= el listado se ordena por relevancia
+        if self.request.query_params.get("search", "").strip():
+            return ("-search_rank", "-id")
+        return None
+
     def get_permissions(self):
-        if self.action in ["create", "update", "partial_update", "destroy"]:
+        if self.action in [
+            "create",
+            "update",
+            "partial_update",
+            "destroy",
+            "import_products",
+        ]:
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
@@ -64,10 +98,28 @@ class ProductViewSet(BaseModelViewSet):
                 type=oa.TYPE_STRING,
                 required=True,
             ),
+            oa.Parameter(
+                name="search",
+                in_=oa.IN_QUERY,
+                description=_("Full-text and fuzzy search on name and description"),
+                type=oa.TYPE_STRING,
+            ),
+            oa.Parameter(
+                name="cursor",
+                in_=oa.IN_QUERY,
+                description=_("Opaque cursor taken from the next/previous links"),
+                type=oa.TYPE_STRING,
+            ),
+            oa.Parameter(
+                name="page_size",
+                in_=oa.IN_QUERY,
+                description=_("Number of products per page (max 100)"),
+                type=oa.TYPE_INTEGER,
+            ),
         ],
         responses={
             200: oa.Response(
-                description=_("List of products"),
+                description=_("Paginated list of products"),
                 schema=ProductListSerializer(many=True),
             ),
             403: oa.Response(
@@ -262,3 +314,170 @@ class ProductViewSet(BaseModelViewSet):
             {"message": _("Product successfully deleted")},
             status=status.HTTP_204_NO_CONTENT,
         )
+
+    # --- IMPORT ---
+    @swagger_auto_schema(
+        operation_description=_(
+            "Import products from a CSV or JSONL file. Existing names are updated "
+            "unless mode=create. Large feeds should use the import_products command."
+        ),
+        manual_parameters=[
+            oa.Parameter(
+                name="Authorization",
+                in_=oa.IN_HEADER,
+                description="Bearer <access_token>",
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+            oa.Parameter(
+                name="file",
+                in_=oa.IN_FORM,
+                description=_(
+                    "Columns: name, category, price, stock, description, status, "
+                    "is_active"
+                ),
+                type=oa.TYPE_FILE,
+                required=True,
+            ),
+            oa.Parameter(
+                name="format",
+                in_=oa.IN_FORM,
+                type=oa.TYPE_STRING,
+                enum=FORMATS,
+            ),
+            oa.Parameter(
+                name="mode", in_=oa.IN_FORM, type=oa.TYPE_STRING, enum=MODES
+            ),
+            oa.Parameter(name="batch_size", in_=oa.IN_FORM, type=oa.TYPE_INTEGER),
+        ],
+        responses={
+            200: oa.Response(description=_("Import report with row-level errors")),
+            400: oa.Response(description=_("Invalid file or options")),
+        },
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_products(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": _("A file is required.")}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = request.data.get("format") or detect_format(upload.name)
+        mode = request.data.get("mode") or "upsert"
+        try:
+            batch_size = int(request.data.get("batch_size") or 1000)
+        except ValueError:
+            batch_size = 0
+        if file_format not in FORMATS or mode not in MODES or batch_size < 1:
+            return Response(
+                {"error": _("Invalid format, mode or batch_size.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        importer = ProductImporter(
+            batch_size=min(batch_size, 5000),
+            mode=mode,
+            user_name=get_user_fullname(request.user),
+            max_errors=1000,
+        )
+        report = importer.run(read_rows(upload, file_format))
+        return Response(report, status=status.HTTP_200_OK)
+
+    # --- EXPORT ---
+    @swagger_auto_schema(
+        operation_description=_(
+            "Stream the whole filtered catalog as NDJSON or CSV, without pagination"
+        ),
+        manual_parameters=[
+            oa.Parameter(
+                name="Authorization",
+                in_=oa.IN_HEADER,
+                description="Bearer <access_token>",
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+            oa.Parameter(
+                name="output",
+                in_=oa.IN_QUERY,
+                description=_("Output format (default ndjson)"),
+                type=oa.TYPE_STRING,
+                enum=[*export.FORMATS],
+            ),
+        ],
+        responses={
+            200: oa.Response(description=_("Streamed catalog file")),
+            400: oa.Response(description=_("Unknown output format")),
+        },
+    )
+    @action(detail=False, methods=["get"], url_path="export")
+    def export_catalog(self, request):
+        file_format = request.query_params.get("output", "ndjson")
+        if file_format not in export.FORMATS:
+            return Response(
+                {"error": _("Unknown output format.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Mismos filtros que el listado, sin paginar ni cachear
+        queryset = self.filter_queryset(self.get_queryset())
+        content_type, filename = export.FORMATS[file_format]
+        response = StreamingHttpResponse(
+            export.stream(queryset, file_format), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # Evita que un proxy acumule la respuesta antes de reenviarla
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    # --- FACETS ---
+    @swagger_auto_schema(
+        operation_description=_(
+            "Counts per category, status and price range for the filtered catalog"
+        ),
+        manual_parameters=[
+            oa.Parameter(
+                name="Authorization",
+                in_=oa.IN_HEADER,
+                description="Bearer <access_token>",
+                type=oa.TYPE_STRING,
+                required=True,
+            ),
+        ],
+        responses={
+            200: oa.Response(
+                description=_("Facet counts"),
+                schema=oa.Schema(
+                    type=oa.TYPE_OBJECT,
+                    properties={
+                        "total": oa.Schema(type=oa.TYPE_INTEGER),
+                        "categories": oa.Schema(type=oa.TYPE_ARRAY, items=FACET),
+                        "statuses": oa.Schema(type=oa.TYPE_ARRAY, items=FACET),
+                        "prices": oa.Schema(type=oa.TYPE_ARRAY, items=FACET),
+                    },
+                ),
+            ),
+        },
+    )
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        # Clave por filtros aplicados; la versión del catálogo la invalida
+        key = catalog_cache.key_for(
+            "facets", facets.signature(request.query_params), facets.get_price_buckets()
+        )
+        data = catalog_cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        data = facets.compute(self.filter_queryset(self.get_queryset()))
+        catalog_cache.set(key, data)
+        response = Response(data)
+        response["X-Cache"] = "MISS"
+        return response
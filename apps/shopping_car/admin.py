@@ -7,7 +7,7 @@ from .models import Cart, CartItem
 class CartItemInline(admin.TabularInline):
     model = CartItem
     extra = 1
-    readonly_fields = ("added_at",)
+    readonly_fields = ("added_at", "held_quantity", "hold_expires_at")
     autocomplete_fields = ["product"]
 
 
@@ -0,0 +1,146 @@
+"""
+Time-limited stock holds for cart lines.
+
+Every change to a cart line reserves (or returns) the difference in the
+inventory ledger as ``hold``/``release`` movements, so a line's
+``held_quantity`` is stock nobody else can buy. Holds expire after
+``CART_HOLD_TTL`` seconds and ``release_expired_holds`` gives them back; until
+then checkout converts them into sales without re-checking availability.
+
+Lock order, shared with checkout and the sweeper: cart, cart lines, products.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.products import inventory
+from apps.shopping_car.models import Cart, CartItem
+
+
+def hold_expiry():
+    return timezone.now() + timedelta(seconds=settings.CART_HOLD_TTL)
+
+
+class CartHolds:
+    """
+    Cambios de cantidad de un carrito con su reserva de stock. Usar dentro de
+    ``transaction.atomic``; ``save`` escribe solo las líneas aceptadas por
+    ``set``.
+    """
+
+    def __init__(self, cart, product_ids):
+        self.cart = Cart.objects.select_for_update().get(pk=cart.pk)
+        product_ids = set(product_ids)
+        self.items = {
+            item.product_id: item
+            for item in CartItem.objects.select_for_update()
+            .filter(cart=self.cart, product_id__in=product_ids)
+            .order_by("id")
+        }
+        inventory.lock_products(product_ids)
+        self.balances = inventory.current_balances(product_ids)
+        self.quantities = {
+            product_id: item.quantity for product_id, item in self.items.items()
+        }
+        # Solo estas líneas pasaron por set(): las demás conservan su cantidad
+        # aunque el barrido les haya quitado la reserva
+        self.changed = set()
+
+    def held(self, product_id):
+        item = self.items.get(product_id)
+        return item.held_quantity if item is not None else 0
+
+    def quantity(self, product_id):
+        return self.quantities.get(product_id, 0)
+
+    def available(self, product_id):
+        """Cantidad máxima que puede tener la línea: libre más lo ya retenido."""
+        return self.balances.get(product_id, 0) + self.held(product_id)
+
+    def remaining(self, product_id):
+        """Saldo libre del producto una vez guardados los cambios."""
+        return self.available(product_id) - self.quantity(product_id)
+
+    def set(self, product_id, quantity):
+        if quantity > self.available(product_id):
+            return False
+        self.quantities[product_id] = quantity
+        self.changed.add(product_id)
+        return True
+
+    def save(self, created_by=""):
+        expires_at = hold_expiry()
+        reference = f"cart:{self.cart.pk}"
+        movements = []
+        to_upsert = []
+        to_delete = []
+
+        for product_id in sorted(self.changed):
+            quantity = self.quantities[product_id]
+            held = self.held(product_id)
+            item = self.items.get(product_id)
+            current = item.quantity if item is not None else 0
+            if quantity == held == current:
+                continue
+            if quantity != held:
+                kind = "hold" if quantity > held else "release"
+                movements.append(
+                    (product_id, kind, held - quantity, reference, created_by)
+                )
+            if quantity == 0:
+                if product_id in self.items:
+                    to_delete.append(product_id)
+            else:
+                to_upsert.append(
+                    CartItem(
+                        cart=self.cart,
+                        product_id=product_id,
+                        quantity=quantity,
+                        held_quantity=quantity,
+                        hold_expires_at=expires_at,
+                    )
+                )
+
+        # Upsert sobre (cart, product); cada cambio renueva la reserva
+        if to_upsert:
+            CartItem.objects.bulk_create(
+                to_upsert,
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                update_fields=["quantity", "held_quantity", "hold_expires_at"],
+            )
+        if to_delete:
+            CartItem.objects.filter(cart=self.cart, product_id__in=to_delete).delete()
+        inventory.record(movements)
+
+
+def release_expired_holds(batch_size=1000):
+    """
+    Devuelve al inventario un lote de reservas vencidas. Las líneas bloqueadas
+    por un checkout en curso se saltan. Devuelve el número de líneas liberadas.
+    """
+    items = list(
+        CartItem.objects.select_for_update(skip_locked=True)
+        .filter(held_quantity__gt=0, hold_expires_at__lt=timezone.now())
+        .order_by("id")[:batch_size]
+    )
+    if not items:
+        return 0
+
+    released = {}
+    for item in items:
+        held = released.get(item.product_id, 0) + item.held_quantity
+        released[item.product_id] = held
+    inventory.lock_products(released)
+    inventory.record(
+        [
+            (product_id, "release", quantity, "hold-expired", "")
+            for product_id, quantity in released.items()
+        ]
+    )
+    CartItem.objects.filter(pk__in=[item.pk for item in items]).update(
+        held_quantity=0, hold_expires_at=None
+    )
+    return len(items)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+
+from apps.shopping_car.models import CartItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Fusiona las líneas duplicadas (cart, product) en la más antigua. "
+        "Ejecutar antes de aplicar la restricción unique_cart_product."
+    )
+
+    def handle(self, *args, **options):
+        duplicates = (
+            CartItem.objects.values("cart_id", "product_id")
+            .annotate(lines=Count("id"), first_id=Min("id"), quantity=Sum("quantity"))
+            .filter(lines__gt=1)
+        )
+
+        merged = 0
+        removed = 0
+        for duplicate in duplicates.iterator():
+            with transaction.atomic():
+                lines = CartItem.objects.filter(
+                    cart_id=duplicate["cart_id"], product_id=duplicate["product_id"]
+                )
+                lines.filter(id=duplicate["first_id"]).update(
+                    quantity=duplicate["quantity"]
+                )
+                count, _ = lines.exclude(id=duplicate["first_id"]).delete()
+            merged += 1
+            removed += count
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{merged} líneas fusionadas, {removed} eliminadas")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.shopping_car.holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Devuelve al inventario el stock de las reservas de carrito vencidas, "
+        "por lotes. Pensado para ejecutarse periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        released = 0
+        while True:
+            # Cada lote en su transacción para no retener bloqueos
+            with transaction.atomic():
+                count = release_expired_holds(options["batch_size"])
+            released += count
+            if count < options["batch_size"]:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"{released} reservas liberadas"))
@@ -1,6 +1,7 @@
 # apps/shopping_cart/models.py
 
 from django.db import models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
 from django.conf import settings
 from apps.products.models.product import Product
 
@@ -16,11 +17,60 @@ class Cart(models.Model):
         return f"Carrito de {self.user.email}"
 
 
+LINE_SUBTOTAL = ExpressionWrapper(
+    F("quantity") * F("product__price"),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+class CartItemQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Líneas del carrito del usuario con su producto y subtotal, sin N+1."""
+        return (
+            self.filter(cart__user=user)
+            .select_related("product")
+            .annotate(subtotal=LINE_SUBTOTAL)
+            .order_by("added_at", "id")
+        )
+
+    def totals(self):
+        """Total, número de líneas y unidades en una sola consulta agregada."""
+        totals = self.aggregate(
+            total=Sum(LINE_SUBTOTAL), item_count=Count("id"), quantity=Sum("quantity")
+        )
+        return {
+            "total": totals["total"] or 0,
+            "item_count": totals["item_count"],
+            "total_quantity": totals["quantity"] or 0,
+        }
+
+
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name="items", on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
+    # Unidades reservadas en el inventario para esta línea (apps.shopping_car.holds)
+    held_quantity = models.PositiveIntegerField(default=0)
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+
+    objects = CartItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Una sola línea por producto; lo exige el upsert de CartHolds.save
+            models.UniqueConstraint(
+                fields=["cart", "product"], name="unique_cart_product"
+            ),
+        ]
+        indexes = [
+            # Barrido de reservas vencidas
+            models.Index(
+                fields=["hold_expires_at"],
+                name="cartitem_hold_expiry_idx",
+                condition=models.Q(held_quantity__gt=0),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
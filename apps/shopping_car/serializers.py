@@ -11,13 +11,43 @@ class CartItemSerializer(serializers.ModelSerializer):
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), source="product"
     )
+    subtotal = serializers.SerializerMethodField()
 
     class Meta:
         model = CartItem
-        fields = ["id", "product", "product_id", "quantity"]
-        read_only_fields = ["product"]
+        fields = [
+            "id",
+            "product",
+            "product_id",
+            "quantity",
+            "held_quantity",
+            "hold_expires_at",
+            "subtotal",
+        ]
+        read_only_fields = ["product", "held_quantity", "hold_expires_at"]
+
+    def get_subtotal(self, obj):
+        # Viene anotado por la BD en las lecturas del carrito
+        subtotal = getattr(obj, "subtotal", None)
+        if subtotal is None:
+            subtotal = obj.product.price * obj.quantity
+        return serializers.DecimalField(
+            max_digits=12, decimal_places=2
+        ).to_representation(subtotal)
 
     def validate_product_id(self, value):
         if not value.is_active:
             raise serializers.ValidationError(_("Producto no disponible"))
         return value
+
+
+class CartOperationSerializer(serializers.Serializer):
+    OPERATIONS = ["add", "set", "remove"]
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    product_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=0, required=False, default=1)
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=500)
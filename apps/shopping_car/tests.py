@@ -1,3 +1,195 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.manager.models import User
+from apps.products import inventory
+from apps.products.models import Category, Product
+from apps.shopping_car.holds import release_expired_holds
+from apps.shopping_car.models import Cart, CartItem
+
+
+def buyer(email):
+    user = User.objects.create_user(email=email, password="secret", first_name="Buyer")
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="buyer@example.com", password="secret", first_name="Buyer"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name="Category")
+        self.product = Product.objects.create(
+            name="Product", price=Decimal("10.00"), category=category, stock=2
+        )
+
+    def test_held_last_units_deactivate_product(self):
+        response = self.client.post(
+            "/shoppin_car/cart/",
+            {"product_id": self.product.pk, "quantity": 2},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/shoppin_car/cart/checkout/", {"payment_amount": "20"}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+
+        self.product.refresh_from_db()
+        self.assertFalse(self.product.is_active)
+        balances = inventory.current_balances([self.product.pk])
+        self.assertEqual(balances[self.product.pk], 0)
+
+
+class CartHoldTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Category")
+        self.product = Product.objects.create(
+            name="Product", price=Decimal("10.00"), category=category, stock=5
+        )
+
+    def add(self, client, quantity):
+        return client.post(
+            "/shoppin_car/cart/",
+            {"product_id": self.product.pk, "quantity": quantity},
+            format="json",
+        )
+
+    def test_repeated_adds_increment_a_single_line(self):
+        client = buyer("adder@example.com")
+        self.assertEqual(self.add(client, 2).status_code, 201)
+        response = self.add(client, 2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["quantity"], 4)
+        self.assertEqual(response.data["held_quantity"], 4)
+        self.assertEqual(CartItem.objects.count(), 1)
+
+        self.assertEqual(self.add(client, 2).status_code, 400)
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+
+    def test_add_rejections(self):
+        client = buyer("adder@example.com")
+        self.assertEqual(self.add(client, 0).status_code, 400)
+        self.assertEqual(self.add(client, "many").status_code, 400)
+        response = client.post(
+            "/shoppin_car/cart/", {"product_id": 999}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+        Product.objects.filter(pk=self.product.pk).update(is_active=False)
+        self.assertEqual(self.add(client, 1).status_code, 400)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_rejected_batch_does_not_rehold_swept_line(self):
+        first, second = buyer("first@example.com"), buyer("second@example.com")
+        self.assertEqual(self.add(first, 5).status_code, 201)
+        CartItem.objects.update(hold_expires_at=timezone.now() - timedelta(1))
+        self.assertEqual(release_expired_holds(), 1)
+        self.assertEqual(self.add(second, 5).status_code, 201)
+
+        response = first.post(
+            "/shoppin_car/cart/batch/",
+            {"operations": [{"op": "add", "product_id": self.product.pk}]},
+            format="json",
+        )
+        self.assertEqual(response.data["results"][0]["status"], "error")
+
+        balances = inventory.current_balances([self.product.pk])
+        self.assertEqual(balances[self.product.pk], 0)
+        held = CartItem.objects.order_by("id").values_list("held_quantity", flat=True)
+        self.assertEqual(list(held), [0, 5])
+
+
+class CartReadTests(TestCase):
+    def setUp(self):
+        self.client = buyer("reader@example.com")
+        category = Category.objects.create(name="Category")
+        for number in range(10):
+            product = Product.objects.create(
+                name=f"Product {number}", price=10, category=category, stock=5
+            )
+            self.client.post(
+                "/shoppin_car/cart/", {"product_id": product.pk}, format="json"
+            )
+
+    def test_summary_totals_come_from_the_database(self):
+        response = self.client.get("/shoppin_car/cart/summary/")
+        self.assertEqual(response.data["item_count"], 10)
+        self.assertEqual(response.data["total_quantity"], 10)
+        self.assertEqual(response.data["total"], "100.00")
+        self.assertEqual(response.data["items"][0]["subtotal"], "10.00")
+
+    def test_reading_an_empty_cart_writes_nothing(self):
+        client = buyer("empty@example.com")
+        with self.assertNumQueries(1):
+            response = client.get("/shoppin_car/cart/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Cart.objects.count(), 1)
+
+    def test_cart_endpoints_query_count_does_not_grow_with_lines(self):
+        # Líneas (y totales), más saldo base y movimientos de todos a la vez
+        for url, queries in [
+            ("/shoppin_car/cart/", 3),
+            ("/shoppin_car/cart/summary/", 4),
+        ]:
+            cache.clear()
+            with self.assertNumQueries(queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+
+class CartBatchTests(TestCase):
+    def setUp(self):
+        self.client = buyer("batch@example.com")
+        category = Category.objects.create(name="Category")
+        self.first, self.second, self.inactive = [
+            Product.objects.create(
+                name=name, price=10, category=category, stock=3, is_active=active
+            )
+            for name, active in [("First", True), ("Second", True), ("Off", False)]
+        ]
+
+    def batch(self, *operations):
+        return self.client.post(
+            "/shoppin_car/cart/batch/", {"operations": operations}, format="json"
+        )
+
+    def test_operations_are_applied_in_order_with_a_result_each(self):
+        response = self.batch(
+            {"op": "add", "product_id": self.first.pk, "quantity": 2},
+            {"op": "add", "product_id": self.first.pk},
+            {"op": "add", "product_id": self.first.pk},
+            {"op": "set", "product_id": self.second.pk, "quantity": 2},
+            {"op": "add", "product_id": self.inactive.pk},
+            {"op": "add", "product_id": 999},
+        )
+        self.assertEqual(response.status_code, 200)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["ok", "ok", "error", "ok", "error", "error"])
+        quantities = {
+            item["product_id"]: item["quantity"] for item in response.data["items"]
+        }
+        self.assertEqual(quantities, {self.first.pk: 3, self.second.pk: 2})
+
+        response = self.batch({"op": "remove", "product_id": self.first.pk})
+        self.assertEqual(
+            [item["product_id"] for item in response.data["items"]], [self.second.pk]
+        )
+        balances = inventory.current_balances([self.first.pk, self.second.pk])
+        self.assertEqual(balances, {self.first.pk: 3, self.second.pk: 1})
 
-# Create your tests here.
+    def test_invalid_body_is_rejected(self):
+        response = self.batch({"op": "drop", "product_id": self.first.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.batch().status_code, 400)
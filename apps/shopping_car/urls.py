@@ -3,12 +3,16 @@
 from django.urls import path
 from apps.shopping_car.views import (
     ShoppingCartView,
+    CartSummaryView,
+    CartBatchView,
     ClearCartView,
     CheckoutFromCartView,
 )
 
 urlpatterns = [
     path("cart/", ShoppingCartView.as_view(), name="shopping-cart"),
+    path("cart/summary/", CartSummaryView.as_view(), name="cart-summary"),
+    path("cart/batch/", CartBatchView.as_view(), name="cart-batch"),
     path("cart/clear/", ClearCartView.as_view(), name="clear-cart"),
     path("cart/checkout/", CheckoutFromCartView.as_view(), name="cart-checkout"),
 ]
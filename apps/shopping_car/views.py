@@ -1,3 +1,6 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.shortcuts import get_object_or_404
@@ -8,10 +11,14 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from apps.common.idempotency import IDEMPOTENCY_KEY_PARAMETER, idempotent
+from apps.products import inventory
 from apps.products.models.product import Product
 from apps.payment.models import Order, OrderItem
+from apps.payment.rollups import record_order
+from apps.shopping_car.holds import CartHolds
 from apps.shopping_car.models import Cart, CartItem
-from apps.shopping_car.serializers import CartItemSerializer
+from apps.shopping_car.serializers import CartBatchSerializer, CartItemSerializer
 from apps.manager.models import User
 
 from drf_yasg import openapi as oa
@@ -25,6 +32,16 @@ def get_user_fullname(user):
     return full_name or user.username
 
 
+def cart_context(items):
+    """Saldos de todos los productos del carrito en un solo acceso a la caché."""
+    product_ids = [item.product_id for item in items]
+    return {"stock_balances": inventory.cached_balances(product_ids)}
+
+
+# Order.total_amount y paid_amount: max_digits=12, decimal_places=2
+MAX_PAYMENT_AMOUNT = Decimal(10**10)
+
+
 # Definimos parámetros reutilizables para Swagger
 AUTH_HEADER = [
     oa.Parameter(
@@ -56,6 +73,25 @@ UPDATE_CART_ITEM_BODY = oa.Schema(
     required=["item_id"],
 )
 
+CART_BATCH_BODY = oa.Schema(
+    type=oa.TYPE_OBJECT,
+    properties={
+        "operations": oa.Schema(
+            type=oa.TYPE_ARRAY,
+            items=oa.Schema(
+                type=oa.TYPE_OBJECT,
+                properties={
+                    "op": oa.Schema(type=oa.TYPE_STRING, enum=["add", "set", "remove"]),
+                    "product_id": oa.Schema(type=oa.TYPE_INTEGER),
+                    "quantity": oa.Schema(type=oa.TYPE_INTEGER, default=1),
+                },
+                required=["op", "product_id"],
+            ),
+        )
+    },
+    required=["operations"],
+)
+
 CLEAR_CART_BODY = oa.Schema(type=oa.TYPE_OBJECT, properties={})
 
 CHECKOUT_CART_BODY = oa.Schema(
@@ -79,37 +115,58 @@ class ShoppingCartView(APIView):
     )
     def post(self, request):
         """Agregar producto al carrito"""
-        product_id = request.data.get("product_id")
-        quantity = int(request.data.get("quantity", 1))
-
         try:
-            product = Product.objects.get(id=product_id)
-        except Product.DoesNotExist:
+            product_id = int(request.data.get("product_id"))
+            quantity = int(request.data.get("quantity", 1))
+        except (TypeError, ValueError):
             return Response(
-                {"error": _("Producto no encontrado")}, status=status.HTTP_404_NOT_FOUND
+                {"error": _("ID o cantidad inválidos")},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-
-        if not created:
-            cart_item.quantity += quantity
-        else:
-            cart_item.quantity = quantity
+        if quantity < 1:
+            return Response(
+                {"error": _("La cantidad debe ser mayor que cero")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # Validar stock
-        if product.stock < cart_item.quantity:
+        product = Product.objects.filter(id=product_id).first()
+        if product is None:
             return Response(
-                {
-                    "error": _("Stock insuficiente. Disponible: %(stock)s")
-                    % {"stock": product.stock}
-                },
+                {"error": _("Producto no encontrado")},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not product.is_active:
+            return Response(
+                {"error": _("Producto no disponible")},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cart_item.save()
+        cart, created = Cart.objects.get_or_create(user=request.user)
+
+        # Reserva el stock de la cantidad añadida hasta CART_HOLD_TTL. Cuesta
+        # más viajes que un upsert único: la reserva lee el saldo bajo el
+        # bloqueo del producto y escribe el movimiento en el mismo commit
+        with transaction.atomic():
+            holds = CartHolds(cart, [product_id])
+            if not holds.set(product_id, holds.quantity(product_id) + quantity):
+                return Response(
+                    {
+                        "error": _("Stock insuficiente. Disponible: %(stock)s")
+                        % {"stock": holds.balances.get(product_id, 0)}
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            holds.save(get_user_fullname(request.user) or "")
+            # El saldo ya se leyó bajo el bloqueo: no hace falta volver a pedirlo
+            balances = {product_id: holds.remaining(product_id)}
 
-        serializer = CartItemSerializer(cart_item)
+        cart_item = CartItem.objects.select_related("product").get(
+            cart=cart, product_id=product_id
+        )
+        serializer = CartItemSerializer(
+            cart_item, context={"stock_balances": balances}
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @swagger_auto_schema(
@@ -125,13 +182,13 @@ class ShoppingCartView(APIView):
     )
     def get(self, request):
         """Ver contenido del carrito"""
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        items = cart.items.all()
+        # Sin get_or_create: leer el carrito no debe crear filas
+        items = list(CartItem.objects.for_user(request.user))
         if not items:
             return Response(
                 {"message": _("Tu carrito está vacío")}, status=status.HTTP_200_OK
             )
-        serializer = CartItemSerializer(items, many=True)
+        serializer = CartItemSerializer(items, many=True, context=cart_context(items))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -157,15 +214,26 @@ class ShoppingCartView(APIView):
         item_id = int(item_id)
 
         try:
-            cart_item = CartItem.objects.get(id=item_id, cart__user=request.user)
+            cart_item = CartItem.objects.select_related("cart", "product").get(
+                id=item_id, cart__user=request.user
+            )
         except CartItem.DoesNotExist:
             return Response(
                 {"error": _("Ítem no encontrado en tu carrito")},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        if quantity and int(quantity) > 0:
-            if cart_item.product.stock < int(quantity):
+        quantity = int(quantity) if quantity and int(quantity) > 0 else 0
+        product_id = cart_item.product_id
+
+        with transaction.atomic():
+            holds = CartHolds(cart_item.cart, [product_id])
+            if product_id not in holds.items:
+                return Response(
+                    {"error": _("Ítem no encontrado en tu carrito")},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            if not holds.set(product_id, quantity):
                 return Response(
                     {
                         "error": _(
@@ -173,22 +241,24 @@ class ShoppingCartView(APIView):
                         )
                         % {
                             "product": cart_item.product.name,
-                            "stock": cart_item.product.stock,
+                            "stock": holds.available(product_id),
                         }
                     },
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+            holds.save(get_user_fullname(request.user) or "")
+            balances = {product_id: holds.remaining(product_id)}
 
-            cart_item.quantity = int(quantity)
-            cart_item.save()
-        else:
-            cart_item.delete()
+        if quantity == 0:
             return Response(
                 {"message": _("Producto eliminado del carrito")},
                 status=status.HTTP_204_NO_CONTENT,
             )
 
-        serializer = CartItemSerializer(cart_item)
+        cart_item.refresh_from_db()
+        serializer = CartItemSerializer(
+            cart_item, context={"stock_balances": balances}
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -215,20 +285,151 @@ class ShoppingCartView(APIView):
         item_id = int(item_id)
 
         try:
-            cart_item = CartItem.objects.get(id=item_id, cart__user=request.user)
+            cart_item = CartItem.objects.select_related("cart").get(
+                id=item_id, cart__user=request.user
+            )
         except CartItem.DoesNotExist:
             return Response(
                 {"error": _("Ítem no encontrado en tu carrito")},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        cart_item.delete()
+        # Borra la línea y devuelve su reserva al inventario
+        with transaction.atomic():
+            holds = CartHolds(cart_item.cart, [cart_item.product_id])
+            holds.set(cart_item.product_id, 0)
+            holds.save(get_user_fullname(request.user) or "")
         return Response(
             {"message": _("Producto eliminado del carrito")},
             status=status.HTTP_204_NO_CONTENT,
         )
 
 
+class CartSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=_("Resumen del carrito con subtotales y total"),
+        manual_parameters=AUTH_HEADER,
+        responses={
+            200: oa.Response(
+                description=_("Líneas del carrito y totales"),
+                schema=oa.Schema(
+                    type=oa.TYPE_OBJECT,
+                    properties={
+                        "items": oa.Schema(
+                            type=oa.TYPE_ARRAY, items=oa.Schema(type=oa.TYPE_OBJECT)
+                        ),
+                        "item_count": oa.Schema(type=oa.TYPE_INTEGER),
+                        "total_quantity": oa.Schema(type=oa.TYPE_INTEGER),
+                        "total": oa.Schema(type=oa.TYPE_STRING),
+                    },
+                ),
+            ),
+        },
+    )
+    def get(self, request):
+        """Líneas con subtotal y totales calculados en la BD"""
+        items = list(CartItem.objects.for_user(request.user))
+        totals = CartItem.objects.filter(cart__user=request.user).totals()
+        serializer = CartItemSerializer(items, many=True, context=cart_context(items))
+        return Response(
+            {
+                "items": serializer.data,
+                "item_count": totals["item_count"],
+                "total_quantity": totals["total_quantity"],
+                "total": f"{totals['total']:.2f}",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class CartBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=_(
+            "Aplicar varias operaciones add/set/remove al carrito en una transacción"
+        ),
+        manual_parameters=AUTH_HEADER,
+        request_body=CART_BATCH_BODY,
+        responses={
+            200: oa.Response(description=_("Resultado de cada operación")),
+            400: oa.Response(description=_("Cuerpo inválido")),
+        },
+    )
+    def post(self, request):
+        """Aplicar un lote de operaciones sobre el carrito"""
+        serializer = CartBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        operations = serializer.validated_data["operations"]
+        product_ids = {operation["product_id"] for operation in operations}
+
+        cart, created = Cart.objects.get_or_create(user=request.user)
+        products = Product.objects.in_bulk(product_ids)
+
+        with transaction.atomic():
+            # Carrito, líneas e inventario bloqueados mientras se aplican
+            holds = CartHolds(cart, product_ids)
+            results = []
+
+            for index, operation in enumerate(operations):
+                product_id = operation["product_id"]
+                result = {
+                    "index": index,
+                    "op": operation["op"],
+                    "product_id": product_id,
+                }
+                product = products.get(product_id)
+
+                if product is None:
+                    results.append(
+                        {**result, "status": "error", "error": _("Producto no encontrado")}
+                    )
+                    continue
+
+                current = holds.quantity(product_id)
+                if operation["op"] == "add":
+                    quantity = current + operation["quantity"]
+                elif operation["op"] == "set":
+                    quantity = operation["quantity"]
+                else:
+                    quantity = 0
+
+                if quantity > 0 and not product.is_active:
+                    results.append(
+                        {**result, "status": "error", "error": _("Producto no disponible")}
+                    )
+                    continue
+
+                if not holds.set(product_id, quantity):
+                    results.append(
+                        {
+                            **result,
+                            "status": "error",
+                            "error": _("Stock insuficiente. Disponible: %(stock)s")
+                            % {"stock": holds.available(product_id)},
+                        }
+                    )
+                    continue
+
+                results.append({**result, "status": "ok", "quantity": quantity})
+
+            holds.save(get_user_fullname(request.user) or "")
+
+        items = list(CartItem.objects.for_user(request.user))
+        serializer = CartItemSerializer(items, many=True, context=cart_context(items))
+        return Response(
+            {
+                "results": results,
+                "items": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class ClearCartView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -244,7 +445,12 @@ class ClearCartView(APIView):
         """Vaciar todo el carrito"""
         try:
             cart = Cart.objects.get(user=request.user)
-            cart.items.all().delete()
+            # Devuelve todas las reservas al vaciar el carrito
+            with transaction.atomic():
+                holds = CartHolds(cart, cart.items.values_list("product_id", flat=True))
+                for product_id in list(holds.quantities):
+                    holds.set(product_id, 0)
+                holds.save(get_user_fullname(request.user) or "")
             return Response(
                 {"message": _("Carrito vaciado correctamente")},
                 status=status.HTTP_200_OK,
@@ -260,7 +466,7 @@ class CheckoutFromCartView(APIView):
 
     @swagger_auto_schema(
         operation_description=_("Realizar compra desde el carrito"),
-        manual_parameters=AUTH_HEADER,
+        manual_parameters=AUTH_HEADER + [IDEMPOTENCY_KEY_PARAMETER],
         request_body=CHECKOUT_CART_BODY,
         responses={
             201: oa.Response(description=_("Compra realizada con éxito")),
@@ -268,27 +474,19 @@ class CheckoutFromCartView(APIView):
             404: oa.Response(description=_("Producto sin stock")),
         },
     )
+    @idempotent
     def post(self, request):
         """Realizar compra desde el carrito"""
-        payment_amount = float(request.data.get("payment_amount", 0.0))
-        cart = Cart.objects.filter(user=request.user).first()
-
-        if not cart or not cart.items.exists():
-            return Response(
-                {"error": _("Tu carrito está vacío")},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        items = cart.items.all()
-        total_price = sum(item.product.price * item.quantity for item in items)
-
-        if payment_amount < total_price:
+        try:
+            payment_amount = Decimal(str(request.data.get("payment_amount", 0)))
+            # NaN e Infinity también se parsean; el importe debe caber en Order
+            if not payment_amount.is_finite() or not (
+                0 <= payment_amount < MAX_PAYMENT_AMOUNT
+            ):
+                raise InvalidOperation
+        except InvalidOperation:
             return Response(
-                {
-                    "error": _("El monto abonado es insuficiente"),
-                    "total": total_price,
-                    "paid": payment_amount,
-                },
+                {"error": _("Monto abonado inválido")},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
@@ -296,57 +494,112 @@ class CheckoutFromCartView(APIView):
         if not full_name:
             raise PermissionDenied(_("Usuario no autenticado"))
 
-        # Crear orden
-        order = Order.objects.create(
-            user=request.user,
-            is_paid=True,
-            created_by=full_name,
-            created_date=timezone.now(),
-        )
+        with transaction.atomic():
+            # Mismo orden de bloqueo que CartHolds y el barrido: carrito, líneas
+            cart = Cart.objects.select_for_update().filter(user=request.user).first()
+            lines = []
+            if cart is not None:
+                lines = list(
+                    CartItem.objects.select_for_update()
+                    .filter(cart=cart)
+                    .order_by("id")
+                    .values_list("product_id", "quantity", "held_quantity")
+                )
+            if not lines:
+                return Response(
+                    {"error": _("Tu carrito está vacío")},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            products = Product.objects.in_bulk({line[0] for line in lines})
 
-        successful_items = []
-        remaining_payment = payment_amount
+            # Lo retenido ya es del carrito; lo no retenido (reservas vencidas)
+            # se comprueba contra el saldo leído bajo bloqueo. También se
+            # bloquean los retenidos: su saldo tras la venta decide si el
+            # producto queda agotado
+            inventory.lock_products(products)
+            balances = inventory.current_balances(products)
 
-        for item in items:
-            product = item.product
-            quantity = item.quantity
-            price = product.price
-            total_cost = quantity * price
+            total_price = sum(
+                products[product_id].price * quantity
+                for product_id, quantity, held in lines
+            )
 
-            if remaining_payment >= total_cost:
-                OrderItem.objects.create(
-                    order=order, product=product, quantity=quantity, price=price
+            if payment_amount < total_price:
+                return Response(
+                    {
+                        "error": _("El monto abonado es insuficiente"),
+                        "total": float(total_price),
+                        "paid": float(payment_amount),
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            successful_items = []
+            order_items = []
+            released = {}
+            sold = {}
+            remaining_payment = payment_amount
+
+            for product_id, quantity, held in lines:
+                product = products[product_id]
+                price = product.price
+                available = held + balances.get(product_id, 0)
+                quantity = min(quantity, available)
+
+                if remaining_payment < quantity * price:
+                    quantity = int(remaining_payment // price)
+                if held:
+                    released[product_id] = held
+                if quantity <= 0:
+                    continue
+
+                order_items.append(
+                    OrderItem(product=product, quantity=quantity, price=price)
                 )
                 successful_items.append({"product": product.name, "quantity": quantity})
-                remaining_payment -= total_cost
-                product.stock -= quantity
-                if product.stock == 0:
-                    product.is_active = False
-                product.save()
-            else:
-                max_quantity = int(remaining_payment // price)
-                if max_quantity > 0:
-                    OrderItem.objects.create(
-                        order=order, product=product, quantity=max_quantity, price=price
-                    )
-                    successful_items.append(
-                        {"product": product.name, "quantity": max_quantity}
-                    )
-                    remaining_payment -= max_quantity * price
-                    product.stock -= max_quantity
-                    if product.stock == 0:
-                        product.is_active = False
-                    product.save()
+                remaining_payment -= quantity * price
+                sold[product_id] = quantity
+
+            # La orden nace con sus totales; las líneas se insertan en bloque
+            order = Order.objects.create(
+                user=request.user,
+                is_paid=True,
+                created_by=full_name,
+                created_date=timezone.now(),
+                total_amount=payment_amount - remaining_payment,
+                item_count=len(order_items),
+                paid_amount=payment_amount,
+                change=remaining_payment,
+            )
+            for order_item in order_items:
+                order_item.order = order
+            OrderItem.objects.bulk_create(order_items)
+            record_order(order, order_items)
+
+            # La reserva se convierte en venta: liberación más venta, sin
+            # volver a validar las líneas retenidas
+            inventory.record(
+                [
+                    (product_id, "release", held, f"cart:{cart.pk}", full_name)
+                    for product_id, held in released.items()
+                ]
+                + [
+                    (product_id, "sale", -quantity, f"order:{order.pk}", full_name)
+                    for product_id, quantity in sold.items()
+                ],
+                balances,
+            )
 
-        # Vaciar carrito después de la compra
-        cart.items.all().delete()
+            # Vaciar carrito después de la compra
+            CartItem.objects.filter(cart=cart).delete()
 
         response_data = {
             "message": _("Compra realizada con éxito"),
             "successful_items": successful_items,
-            "total": round(total_price, 2),
-            "paid": round(payment_amount, 2),
-            "change": round(remaining_payment, 2),
+            "total": float(total_price),
+            "paid": float(payment_amount),
+            "change": float(remaining_payment),
         }
 
         return Response(response_data, status=status.HTTP_201_CREATED)
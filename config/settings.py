@@ -40,6 +40,7 @@ BASE_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 LOCAL_APPS = [
@@ -112,6 +113,46 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Un solo proceso: LocMemCache. Varios procesos o nodos: FileBasedCache sobre
+# un directorio compartido o DatabaseCache (python manage.py createcachetable).
+# Con LocMemCache cada worker tiene su propia versión del catálogo: un cambio
+# hecho en otro worker se ve cuando caducan sus entradas (TIMEOUT, 300 s).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalog",
+        "TIMEOUT": 300,
+    },
+}
+
+# Alias usado por la caché de respuestas del catálogo
+CATALOG_CACHE_ALIAS = "catalog"
+# Límites de los tramos de precio del endpoint de facetas
+CATALOG_PRICE_BUCKETS = [0, 10, 25, 50, 100, 250, 500, 1000]
+
+# Segundos que se cachea el saldo de inventario (se invalida en cada movimiento)
+INVENTORY_BALANCE_TTL = 300
+
+# Admisión de compras en ofertas relámpago (apps.payment.admission). La caché
+# debe ser compartida entre procesos en producción.
+FLASH_SALE_CACHE = "default"
+FLASH_SALE_BATCH_SIZE = 20
+FLASH_SALE_MAX_QUEUE = 200
+FLASH_SALE_MAX_WAIT = 2.0
+FLASH_SALE_RETRY_AFTER = 2
+FLASH_SALE_COUNTER_TTL = 30
+FLASH_SALE_QUEUE_TTL = 60 * 60
+
+# Segundos que una línea del carrito retiene su stock
+CART_HOLD_TTL = 15 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -148,6 +189,23 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Archivos subidos (imágenes de productos y sus variantes)
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Variantes de imagen de producto: nombre -> caja máxima (ancho, alto)
+PRODUCT_IMAGE_VARIANTS = {
+    "thumb": (200, 200),
+    "medium": (600, 600),
+}
+PRODUCT_IMAGE_FORMATS = ["webp", "jpeg"]
+PRODUCT_IMAGE_QUALITY = 82
+# Procesos del pool de miniaturas; None usa todos los núcleos
+PRODUCT_IMAGE_WORKERS = 2
+# Límites de subida; las dimensiones se leen de la cabecera
+PRODUCT_IMAGE_MAX_SIZE_MB = 5
+PRODUCT_IMAGE_MAX_DIMENSION = 8000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -155,6 +213,21 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "manager.user"
 
+# Diccionario de PostgreSQL para la búsqueda de productos
+PRODUCT_SEARCH_CONFIG = "spanish"
+
+# Ruta rápida de JWTAuthentication: segundos entre refrescos del filtro de
+# tokens revocados, margen (segundos) para filas confirmadas con retraso y
+# tamaño/TTL (segundos) de la caché de usuarios. La caché es por proceso: un
+# usuario desactivado sigue autenticándose en otros workers hasta el TTL
+JWT_REVOKED_TOKENS_REFRESH = 30
+JWT_REVOKED_TOKENS_OVERLAP = 120
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_TTL = 60
+
+# Segundos que se conserva la respuesta asociada a una Idempotency-Key
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "apps.authentication.authentication.JWTAuthentication",